@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Build Benchmark
+
+Times cold and warm builds of synthetic sites modeled on the sample
+sites (vacation-rental-marketplace, fashion-model-portfolio,
+portfolio-website) and compares them with a stored baseline to flag
+regressions.
+
+Each synthetic site is a copy of a sample site plus generated pages
+based on its index.html, with stylesheets, scripts and images added in
+proportion to the page count. Builds run as separate build.py
+processes with --report json, so peak RSS is measured per build.
+"""
+
+import os
+import re
+import sys
+import json
+import zlib
+import shutil
+import struct
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+from build import CACHE_DIR_NAME, EXCLUDED_DIRS
+
+BUILD_SCRIPT = Path(__file__).resolve().parent / 'build.py'
+
+SAMPLE_SITES = ('vacation-rental-marketplace', 'fashion-model-portfolio', 'portfolio-website')
+PAGE_COUNTS = (100, 1000, 10000)
+
+# Generated pages per directory, stylesheet, script and image
+PAGES_PER_SECTION = 100
+PAGES_PER_STYLESHEET = 50
+PAGES_PER_SCRIPT = 50
+PAGES_PER_IMAGE = 10
+IMAGE_SIZE = (1280, 853)
+
+# Bump to regenerate synthetic sites kept in the work directory
+GENERATOR_VERSION = 1
+SITE_MARKER = '.bench-site'
+
+BASELINE_VERSION = 1
+
+# Differences below this are noise, whatever the relative change
+MIN_REGRESSION_SECONDS = 0.05
+
+_RELATIVE_URL = re.compile(
+    r'''(\s(?:href|src)\s*=\s*["'])(?![a-zA-Z][a-zA-Z0-9+.-]*:|//|#|/)''', re.IGNORECASE)
+_TITLE = re.compile(r'<title>.*?</title>', re.IGNORECASE | re.DOTALL)
+
+
+def parse_count(value):
+    """Parse a page count such as 100, 1k or 10k"""
+    value = value.strip().lower()
+    if value.endswith('k'):
+        return int(float(value[:-1]) * 1000)
+    return int(value)
+
+
+def find_sample_sites(root, names):
+    """Find the sample sites below root"""
+    root = Path(root).resolve()
+    return [root / name for name in names if (root / name / 'index.html').exists()]
+
+
+def write_png(path, width, height, seed):
+    """Write a gradient PNG; needs no imaging library"""
+    base = bytes(i % 251 for i in range(width * 3 * 2))
+    rows = []
+    for y in range(height):
+        offset = (y * 3 + seed * 7) % (width * 3)
+        # Filter type 0 followed by one row of RGB pixels
+        rows.append(b'\0' + base[offset:offset + width * 3])
+
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack('>I', len(data)) + body + struct.pack('>I', zlib.crc32(body))
+
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b'IDAT', zlib.compress(b''.join(rows), 6)))
+        f.write(chunk(b'IEND', b''))
+
+
+def generate_page(template, number, prefix, stylesheet, script, images):
+    """Build a page from a sample index.html
+
+    Relative URLs are made valid from the page's directory, and the
+    page gets its own title, content, section stylesheet, script and
+    images so that every page differs.
+    """
+    content = _RELATIVE_URL.sub(lambda m: m.group(1) + prefix, template)
+    content = _TITLE.sub(f'<title>Generated page {number}</title>', content, count=1)
+
+    figures = ''.join(
+        f'<figure class="col-md-4"><img src="{prefix}{image}" alt="Photo {number}" '
+        f'class="img-fluid rounded"></figure>' for image in images)
+    body = (f'<main class="container generated-page page-{number}"><h1>Generated page {number}</h1>'
+            f'<p class="lead">Synthetic content for build benchmark page {number}.</p>'
+            f'<div class="row">{figures}</div></main>'
+            f'<script src="{prefix}{script}"></script>')
+
+    lowered = content.lower()
+    head = lowered.rfind('</head>')
+    if head != -1:
+        content = (content[:head] + f'<link rel="stylesheet" href="{prefix}{stylesheet}">'
+                   + content[head:])
+        lowered = content.lower()
+    end = lowered.rfind('</body>')
+    if end == -1:
+        return content + body
+    return content[:end] + body + content[end:]
+
+
+def generate_site(sample, pages, dest):
+    """Create a synthetic site with the given number of generated pages
+
+    A site already generated with the same settings is reused.
+    """
+    marker = dest / SITE_MARKER
+    settings = {'generator': GENERATOR_VERSION, 'sample': sample.name, 'pages': pages}
+    if marker.exists() and json.loads(marker.read_text(encoding='utf-8')) == settings:
+        return False
+
+    if dest.exists():
+        shutil.rmtree(dest)
+    shutil.copytree(sample, dest, ignore=shutil.ignore_patterns(*EXCLUDED_DIRS, '*.zip'))
+
+    template = (sample / 'index.html').read_text(encoding='utf-8')
+    stylesheet = (sample / 'assets' / 'css' / 'main.css').read_text(encoding='utf-8')
+    script = (sample / 'assets' / 'js' / 'main.js').read_text(encoding='utf-8')
+
+    generated = dest / 'assets' / 'generated'
+    (generated / 'css').mkdir(parents=True)
+    (generated / 'js').mkdir()
+    (generated / 'images').mkdir()
+
+    stylesheets = []
+    for number in range(max(1, pages // PAGES_PER_STYLESHEET)):
+        name = f"assets/generated/css/section-{number}.css"
+        (dest / name).write_text(f"/* Section {number} */\n.page-{number} {{ order: {number}; }}\n"
+                                 + stylesheet, encoding='utf-8')
+        stylesheets.append(name)
+
+    scripts = []
+    for number in range(max(1, pages // PAGES_PER_SCRIPT)):
+        name = f"assets/generated/js/section-{number}.js"
+        (dest / name).write_text(f"/* Section {number} */\n" + script, encoding='utf-8')
+        scripts.append(name)
+
+    images = []
+    for number in range(max(1, pages // PAGES_PER_IMAGE)):
+        name = f"assets/generated/images/photo-{number}.png"
+        write_png(dest / name, *IMAGE_SIZE, seed=number)
+        images.append(name)
+
+    for number in range(pages):
+        section = dest / 'pages' / 'generated' / f"section-{number // PAGES_PER_SECTION}"
+        section.mkdir(parents=True, exist_ok=True)
+        # Three images per page, shared with neighbouring pages
+        shown = [images[(number + offset) % len(images)] for offset in range(3)]
+        page = generate_page(template, number, '../../../',
+                             stylesheets[number % len(stylesheets)],
+                             scripts[number % len(scripts)], shown)
+        (section / f"page-{number}.html").write_text(page, encoding='utf-8')
+
+    marker.write_text(json.dumps(settings), encoding='utf-8')
+    return True
+
+
+def run_build(site, clean, jobs):
+    """Build a site in a separate process and return its JSON summary"""
+    command = [sys.executable, str(BUILD_SCRIPT), str(site), '--report', 'json']
+    if clean:
+        command.append('--clean')
+    if jobs:
+        command.extend(['--jobs', str(jobs)])
+
+    process = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                             universal_newlines=True)
+    try:
+        summary = json.loads(process.stdout)
+    except ValueError:
+        summary = None
+    if process.returncode != 0 or not summary or not summary.get('success'):
+        raise RuntimeError(f"build of {site} failed:\n{process.stderr[-2000:]}")
+    return summary
+
+
+def reset_site(site):
+    """Remove build outputs, caches and packages for a cold build"""
+    for name in ('dist', CACHE_DIR_NAME):
+        if (site / name).exists():
+            shutil.rmtree(site / name)
+    for package in site.glob('website_*.zip'):
+        package.unlink()
+
+
+def benchmark_site(site, jobs, repeat):
+    """Time cold and warm builds; the fastest of `repeat` runs is kept"""
+    results = {}
+    for _ in range(repeat):
+        reset_site(site)
+        runs = {'cold': run_build(site, True, jobs), 'warm': run_build(site, False, jobs)}
+        for mode, summary in runs.items():
+            if mode not in results or summary['duration'] < results[mode]['duration']:
+                results[mode] = summary
+
+    return {mode: {
+        'wall_time': summary['duration'],
+        'cpu_time': summary['cpu_time'],
+        'peak_rss': summary['peak_rss'],
+        'files': summary['files']['total'],
+        'cache_hits': summary['cache_hits'],
+        'stages': {stats['name']: stats['wall_time'] for stats in summary['stages']},
+    } for mode, summary in results.items()}
+
+
+def load_baseline(path):
+    """Load stored baseline results, or an empty baseline"""
+    if not path.exists():
+        return {'version': BASELINE_VERSION, 'jobs': None, 'results': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('version') != BASELINE_VERSION:
+        print(f"  ℹ️  Ignoring baseline with unknown version: {path}")
+        return {'version': BASELINE_VERSION, 'jobs': None, 'results': {}}
+    return baseline
+
+
+def is_regression(wall_time, baseline_time, threshold):
+    """Check whether a build got slower than the baseline allows"""
+    return (wall_time > baseline_time * (1 + threshold)
+            and wall_time - baseline_time > MIN_REGRESSION_SECONDS)
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Benchmark cold and warm builds of synthetic sites')
+    parser.add_argument('--root', default='.',
+                        help='directory containing the sample sites (default: .)')
+    parser.add_argument('--sites', default=','.join(SAMPLE_SITES),
+                        help='comma-separated sample sites to model (default: all three)')
+    parser.add_argument('--pages', default=','.join(str(count) for count in PAGE_COUNTS),
+                        help='comma-separated page counts, e.g. 100,1k,10k (default: 100,1000,10000)')
+    parser.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), 'website-build-bench'),
+                        help='where synthetic sites are generated and kept between runs')
+    parser.add_argument('--jobs', '-j', type=int, default=None, metavar='N',
+                        help='worker processes per build (default: CPU count)')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='runs per site; the fastest run is reported (default: 1)')
+    parser.add_argument('--baseline', default='build-baseline.json',
+                        help='stored results to compare against (default: build-baseline.json)')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='store these results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.2, metavar='R',
+                        help='flag builds more than R times slower than the baseline (default: 0.2)')
+    parser.add_argument('--report', choices=('text', 'json'), default='text',
+                        help='json: print all results as JSON on stdout (default: text)')
+    args = parser.parse_args()
+
+    samples = find_sample_sites(args.root, [name.strip() for name in args.sites.split(',')])
+    if not samples:
+        print("❌ No sample sites found")
+        sys.exit(1)
+    page_counts = [parse_count(count) for count in args.pages.split(',')]
+    workdir = Path(args.workdir).resolve()
+    baseline_path = Path(args.baseline)
+    baseline = load_baseline(baseline_path)
+
+    # Progress goes to stderr when stdout carries the JSON report
+    log = sys.stderr if args.report == 'json' else sys.stdout
+
+    results = {}
+    for sample in samples:
+        for pages in page_counts:
+            site = workdir / f"{sample.name}-{pages}"
+            print(f"\n🏗️  {sample.name} ({pages} pages)", file=log)
+            if generate_site(sample, pages, site):
+                print(f"  ✓ Generated: {site}", file=log)
+            for mode, result in benchmark_site(site, args.jobs, args.repeat).items():
+                results[f"{sample.name}/{pages}/{mode}"] = result
+                print(f"  ✓ {mode}: {result['wall_time']:.2f}s", file=log)
+
+    jobs = args.jobs or os.cpu_count() or 1
+    if baseline['results'] and baseline.get('jobs') != jobs:
+        print(f"  ℹ️  Baseline was measured with {baseline.get('jobs')} job(s), "
+              f"this run used {jobs}", file=log)
+
+    regressions = []
+    print("\n⏱️  Build Benchmark:", file=log)
+    print("=" * 92, file=log)
+    print(f"  {'Site':<30} {'Pages':>6} {'Build':<5} {'Wall':>8} {'CPU':>8} {'RSS MB':>7} "
+          f"{'Baseline':>9} {'Change':>7}", file=log)
+    for name, result in results.items():
+        sample, pages, mode = name.split('/')
+        rss = f"{result['peak_rss'] / (1024 * 1024):.0f}" if result['peak_rss'] else "n/a"
+        line = (f"  {sample:<30} {pages:>6} {mode:<5} {result['wall_time']:>7.2f}s "
+                f"{result['cpu_time']:>7.2f}s {rss:>7}")
+        previous = baseline['results'].get(name)
+        if previous:
+            change = result['wall_time'] / previous['wall_time'] - 1 if previous['wall_time'] else 0
+            line += f" {previous['wall_time']:>8.2f}s {change:>+7.0%}"
+            if is_regression(result['wall_time'], previous['wall_time'], args.threshold):
+                regressions.append(name)
+                line += "  ⚠️"
+        print(line, file=log)
+    print("=" * 92, file=log)
+
+    if args.save_baseline:
+        baseline['jobs'] = jobs
+        baseline['results'].update(results)
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\n✓ Baseline saved: {baseline_path}", file=log)
+    elif regressions:
+        print(f"\n⚠️  {len(regressions)} build(s) more than {args.threshold:.0%} slower than "
+              f"the baseline", file=log)
+    elif baseline['results']:
+        print("\n✅ No regressions", file=log)
+
+    if args.report == 'json':
+        json.dump({'jobs': jobs, 'threshold': args.threshold, 'regressions': regressions,
+                   'results': results}, sys.stdout, indent=2)
+        print()
+
+    sys.exit(1 if regressions and not args.save_baseline else 0)
+
+
+if __name__ == '__main__':
+    main()
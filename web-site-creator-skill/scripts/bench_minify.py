@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Minifier Benchmark
+
+Measures throughput (MB/s) and compression ratio of the streaming
+minifiers in minify.py on real stylesheets and scripts.
+
+By default the benchmark looks for the sample sites' bundles
+(*/assets/js/main.js and */assets/css/main.css) below the given root.
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+from minify import MINIFIERS, minify_text
+
+
+def find_sample_files(root):
+    """Find the sample sites' main.js and main.css bundles"""
+    root = Path(root).resolve()
+    files = sorted(root.glob('*/assets/js/main.js')) + sorted(root.glob('*/assets/css/main.css'))
+    return [f for f in files if 'node_modules' not in f.parts and 'dist' not in f.parts]
+
+
+def benchmark_file(path, repeat, chunk_size):
+    """Minify a file repeatedly and return (size, minified size, best time)"""
+    content = path.read_text(encoding='utf-8')
+    minifier_class = MINIFIERS[path.suffix]
+
+    best = None
+    output = ''
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = minify_text(content, minifier_class(), chunk_size)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return len(content.encode('utf-8')), len(output.encode('utf-8')), best
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Benchmark the CSS/JS minifiers')
+    parser.add_argument('paths', nargs='*',
+                        help='CSS/JS files to benchmark (default: sample site bundles)')
+    parser.add_argument('--root', default='.',
+                        help='directory containing the sample sites (default: .)')
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='runs per file; the fastest run is reported (default: 20)')
+    parser.add_argument('--chunk-size', type=int, default=64 * 1024,
+                        help='characters fed to the minifier at a time (default: 65536)')
+    args = parser.parse_args()
+
+    files = [Path(p) for p in args.paths] or find_sample_files(args.root)
+    files = [f for f in files if f.suffix in MINIFIERS]
+    if not files:
+        print("❌ No CSS/JS files found")
+        sys.exit(1)
+
+    print("\n⏱️  Minifier Benchmark:")
+    print("=" * 78)
+    print(f"  {'File':<44} {'Size':>9} {'Minified':>9} {'Ratio':>6} {'MB/s':>6}")
+
+    totals = {}
+    for path in files:
+        size, minified, elapsed = benchmark_file(path, args.repeat, args.chunk_size)
+        total = totals.setdefault(path.suffix, [0, 0, 0.0])
+        total[0] += size
+        total[1] += minified
+        total[2] += elapsed
+
+        try:
+            label = str(path.resolve().relative_to(Path(args.root).resolve()))
+        except ValueError:
+            label = str(path)
+        print(f"  {label[-44:]:<44} {size:>9} {minified:>9} "
+              f"{minified / size:>6.1%} {size / elapsed / 1e6:>6.2f}")
+
+    print("-" * 78)
+    for suffix, (size, minified, elapsed) in sorted(totals.items()):
+        print(f"  {'Total ' + suffix:<44} {size:>9} {minified:>9} "
+              f"{minified / size:>6.1%} {size / elapsed / 1e6:>6.2f}")
+    print("=" * 78)
+
+
+if __name__ == '__main__':
+    main()
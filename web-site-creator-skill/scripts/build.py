@@ -0,0 +1,1266 @@
+#!/usr/bin/env python3
+"""
+Build Automation Script for Website Projects
+
+This script automates the build process for static websites:
+- Minifies CSS files
+- Minifies JavaScript files
+- Optimizes images (responsive variants, WebP, srcset)
+- Prunes unused CSS rules and inlines critical CSS
+- Generates deployment package
+- Reports wall/CPU time, I/O and cache hits per stage (text or JSON)
+
+Builds are incremental: a manifest in dist/ records the hash, size and
+mtime of every source file, so only changed files are reprocessed.
+Sources are discovered in a single directory walk and each file is
+streamed, transformed and written once by a pool of worker processes.
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import codecs
+import shutil
+import hashlib
+import argparse
+import threading
+import subprocess
+import multiprocessing
+from pathlib import Path
+from datetime import datetime
+from functools import partial
+from contextlib import contextmanager, redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak RSS is then reported as unknown
+    resource = None
+
+from minify import CHUNK_SIZE, MINIFIERS, minify_text
+from fingerprint import fingerprint_name, rewrite_css, rewrite_html, should_fingerprint
+from critical_css import (CRITICAL_VERSION, FOLD_ELEMENTS, MAX_CRITICAL_BYTES, SAFELIST,
+                          collect_selectors, critical_css, inline_critical, parse_css,
+                          prune_css)
+from images import (DEFAULT_SIZES, IMAGE_EXTENSIONS, IMAGE_SETTINGS, MIME_TYPES, Image,
+                    cached_variants, rewrite_images, variant_key)
+
+# Build manifest stored inside the build directory
+MANIFEST_NAME = '.build-manifest.json'
+MANIFEST_VERSION = 6
+
+# Map of original to fingerprinted asset names, written to dist/
+ASSET_MANIFEST_NAME = 'asset-manifest.json'
+
+# Files to copy
+SOURCE_EXTENSIONS = {'.html', '.css', '.js', '.json', '.xml', '.ico', '.txt',
+                     '.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif', '.svg',
+                     '.woff', '.woff2', '.ttf', '.otf', '.eot'}
+
+# Build cache kept across clean builds (encoded images)
+CACHE_DIR_NAME = '.build-cache'
+
+# Directories never treated as sources (pruned during discovery)
+EXCLUDED_DIRS = {'node_modules', 'dist', '.git', CACHE_DIR_NAME}
+
+# Transform settings per extension; bump a version to invalidate old outputs
+TRANSFORM_SETTINGS = {
+    '.css': {'minify': 'css-tokenizer-1'},
+    '.js': {'minify': 'js-tokenizer-2'},
+}
+
+# Files whose asset references are rewritten to fingerprinted names
+REWRITE_EXTENSIONS = {'.css', '.html'}
+
+# Text outputs that get precompressed .gz/.br sidecars
+COMPRESS_EXTENSIONS = {'.html', '.css', '.js', '.json', '.xml', '.svg', '.txt'}
+SIDECAR_FORMATS = ('gz', 'br')
+
+# Counters kept for every build stage
+STAGE_COUNTERS = ('files', 'bytes_in', 'bytes_out', 'cache_hits')
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes, or None if unknown"""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return usage if sys.platform == 'darwin' else usage * 1024
+
+
+def pool_context():
+    """Start method for worker processes
+
+    Forking copies locks held by other threads in their current state,
+    so a build started from a multithreaded process (the preview
+    server's watcher) gets workers from a fork server or spawned
+    interpreters instead. Returns None for the platform default.
+    """
+    if threading.active_count() == 1:
+        return None
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def measured(worker, task):
+    """Run a worker task and attach the CPU time and peak RSS it used
+
+    Runs inside worker processes, whose CPU time the main process
+    cannot see until they exit.
+    """
+    start = time.process_time()
+    result = worker(task)
+    result['usage'] = (time.process_time() - start, peak_rss())
+    return result
+
+
+def stream_file(source, tmp, minifier=None):
+    """Copy a file in chunks, minifying it when a minifier is given
+
+    Memory use is bounded by the chunk size regardless of file size.
+    Returns (source hash, output hash, bytes in, bytes out, references).
+    """
+    source_digest = hashlib.sha256()
+    output_digest = hashlib.sha256()
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    bytes_in = bytes_out = 0
+
+    with open(source, 'rb') as src, open(tmp, 'wb') as out:
+        for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+            source_digest.update(chunk)
+            bytes_in += len(chunk)
+            if minifier:
+                chunk = minifier.feed(decoder.decode(chunk)).encode('utf-8')
+            output_digest.update(chunk)
+            out.write(chunk)
+            bytes_out += len(chunk)
+        if minifier:
+            chunk = (minifier.feed(decoder.decode(b'', final=True)) + minifier.finish()).encode('utf-8')
+            output_digest.update(chunk)
+            out.write(chunk)
+            bytes_out += len(chunk)
+
+    return source_digest.hexdigest(), output_digest.hexdigest(), bytes_in, bytes_out, []
+
+
+def rewrite_file(source, tmp, key, asset_map, minifier=None, images=None, sizes=DEFAULT_SIZES):
+    """Minify a CSS/HTML file and point its references at fingerprinted assets
+
+    Rewriting needs the whole document, so the file is read into memory.
+    When images is given, <img> tags showing optimized images get
+    responsive markup first.
+    Returns (source hash, output hash, bytes in, bytes out, references).
+    """
+    with open(source, 'rb') as f:
+        data = f.read()
+
+    content = data.decode('utf-8')
+    if minifier:
+        content = minify_text(content, minifier)
+    references = set()
+    if key.lower().endswith('.css'):
+        content = rewrite_css(content, key, asset_map, references)
+    else:
+        if images:
+            content = rewrite_images(content, key, images, references, sizes)
+        content = rewrite_html(content, key, asset_map, references)
+    output = content.encode('utf-8')
+
+    with open(tmp, 'wb') as f:
+        f.write(output)
+
+    return (hashlib.sha256(data).hexdigest(), hashlib.sha256(output).hexdigest(),
+            len(data), len(output), sorted(references))
+
+
+def write_unhashed_copy(build_dir, key, output):
+    """Copy a fingerprinted output to the original name of its source
+
+    References the build cannot rewrite (URLs built in JavaScript, module
+    imports, web manifest icons) keep resolving to the copy.
+    """
+    dest = os.path.join(build_dir, key)
+    shutil.copyfile(os.path.join(build_dir, output), dest + '.tmp')
+    os.replace(dest + '.tmp', dest)
+
+
+def process_file(task):
+    """Transform and write a single source file
+
+    Runs inside worker processes, so it only takes and returns plain
+    dicts. The source is read once and written to a temporary file that
+    is renamed to its final (possibly fingerprinted) name. When the
+    source hash matches the previous build the existing output is kept.
+    """
+    if task['image']:
+        return process_image(task)
+
+    key = task['key']
+    tmp = os.path.join(task['build_dir'], key + '.tmp')
+    os.makedirs(os.path.dirname(tmp), exist_ok=True)
+
+    result = {
+        'key': key,
+        'error': None,
+    }
+    outcome = None
+    minifier = MINIFIERS.get(task['ext'])
+    try:
+        if task['asset_map'] is not None:
+            outcome = rewrite_file(task['source'], tmp, key, task['asset_map'],
+                                   minifier() if minifier else None,
+                                   task['images'], task['image_sizes'])
+        elif minifier:
+            outcome = stream_file(task['source'], tmp, minifier())
+    except Exception as e:
+        # Ship the untransformed file rather than failing the build
+        result['error'] = f"Error processing: {e}"
+    if outcome is None:
+        outcome = stream_file(task['source'], tmp)
+
+    result['hash'], output_hash, result['bytes_in'], result['bytes_out'], result['references'] = outcome
+    if task['selectors']:
+        # Selector usage for CSS pruning, taken from the fresh output
+        with open(tmp, 'r', encoding='utf-8', errors='replace') as f:
+            result['selectors'] = collect_selectors(f.read(), key, task['fold_elements'])
+    if result['hash'] == task['previous_hash']:
+        os.remove(tmp)
+        result.update(changed=False, output=task['previous_output'],
+                      bytes_out=task['previous_output_size'])
+        return result
+
+    output = fingerprint_name(key, output_hash) if task['fingerprint'] else key
+    os.replace(tmp, os.path.join(task['build_dir'], output))
+    if output != key:
+        write_unhashed_copy(task['build_dir'], key, output)
+    result.update(changed=True, output=output)
+    return result
+
+
+def process_image(task):
+    """Write an optimized image and its responsive variants
+
+    Runs inside worker processes. Variants are encoded once per image
+    content and settings and then copied from the build cache; an image
+    that cannot be decoded is copied unchanged.
+    """
+    key = task['key']
+    with open(task['source'], 'rb') as f:
+        data = f.read()
+
+    result = {
+        'key': key,
+        'error': None,
+        'hash': hashlib.sha256(data).hexdigest(),
+        'bytes_in': len(data),
+        'references': [],
+    }
+    if result['hash'] == task['previous_hash']:
+        result.update(changed=False, output=task['previous_output'],
+                      bytes_out=task['previous_output_size'], image=task['previous_image'])
+        return result
+
+    try:
+        meta, cache_entry, result['cache_hit'] = cached_variants(
+            data, task['ext'].lower(), task['image'], task['image_cache'])
+    except Exception as e:
+        result = process_file(dict(task, image=None))
+        result['error'] = f"Error optimizing: {e}"
+        return result
+
+    outputs = []
+    for file in meta['files']:
+        file_key = variant_key(key, file['suffix']) if file['suffix'] else key
+        output = fingerprint_name(file_key, file['hash']) if task['fingerprint'] else file_key
+        dest = os.path.join(task['build_dir'], output)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        shutil.copyfile(os.path.join(cache_entry, file['name']), dest + '.tmp')
+        os.replace(dest + '.tmp', dest)
+        outputs.append({
+            'key': file_key,
+            'output': output,
+            'width': file['width'],
+            'type': MIME_TYPES[os.path.splitext(file_key)[1].lower()],
+        })
+
+    if outputs[0]['output'] != key:
+        write_unhashed_copy(task['build_dir'], key, outputs[0]['output'])
+    result.update(changed=True, output=outputs[0]['output'], bytes_out=meta['files'][0]['size'])
+    result['image'] = {
+        'width': meta['width'],
+        'height': meta['height'],
+        'type': outputs[0]['type'],
+        'bytes': sum(file['size'] for file in meta['files']),
+        'variants': outputs[1:],
+    }
+    return result
+
+
+def pruned_key(key):
+    """Build path of a pruned stylesheet: a/main.css -> a/main.pruned.css"""
+    stem, ext = os.path.splitext(key)
+    return f"{stem}.pruned{ext}"
+
+
+def entry_outputs(entry):
+    """All build outputs of a manifest entry: the file, its unhashed copy and image variants"""
+    outputs = [entry['output']] if entry.get('output') else []
+    if entry.get('unhashed'):
+        outputs.append(entry['unhashed'])
+    outputs.extend(variant['output'] for variant in entry.get('image', {}).get('variants', []))
+    return outputs
+
+
+def compress_file(task):
+    """Write precompressed sidecars (.gz, .br) for a single build output
+
+    Runs inside worker processes. A sidecar is only kept when it is at
+    most max_ratio times the size of the original; otherwise any stale
+    sidecar is removed. Returns the sizes of the sidecars kept.
+    """
+    with open(task['path'], 'rb') as f:
+        data = f.read()
+
+    result = {'key': task['key'], 'raw': len(data)}
+    for fmt in SIDECAR_FORMATS:
+        sidecar = f"{task['path']}.{fmt}"
+        compressed = None
+        if fmt == 'gz':
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        elif task['brotli']:
+            compressed = brotli.compress(data, quality=11)
+
+        if compressed is not None and len(compressed) <= len(data) * task['max_ratio']:
+            with open(sidecar, 'wb') as f:
+                f.write(compressed)
+            result[fmt] = len(compressed)
+        else:
+            if os.path.exists(sidecar):
+                os.remove(sidecar)
+            result[fmt] = None
+
+    return result
+
+
+class WebsiteBuilder:
+    """Build automation for website projects"""
+
+    def __init__(self, project_path='.', clean=False, jobs=None, fingerprint=True,
+                 compress=True, compress_ratio=0.9, package=True, images=True,
+                 image_sizes=DEFAULT_SIZES, critical=True, css_safelist=()):
+        self.project_path = Path(project_path).resolve()
+        self.build_dir = self.project_path / 'dist'
+        self.timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.clean = clean
+        self.jobs = jobs or os.cpu_count() or 1
+        self.fingerprint = fingerprint
+        self.compress = compress
+        self.compress_ratio = compress_ratio
+        self.package = package
+        # Images are copied unchanged when Pillow is missing
+        self.image_optimization = images and Image is not None
+        self.image_sizes = image_sizes
+        self.cache_dir = self.project_path / CACHE_DIR_NAME
+        self.image_map = {}
+        self.image_variants = set()
+        self.image_cache_hits = 0
+        self.critical_css = critical
+        self.fold_elements = FOLD_ELEMENTS
+        self.css_safelist = SAFELIST | set(css_safelist)
+        self.sources = {}
+        self.asset_map = {}
+        self.compressed_count = 0
+        self.manifest_path = self.build_dir / MANIFEST_NAME
+        self.previous_files = {}
+        self.previous_package = None
+        self.manifest_files = {}
+        self.results = []
+        self.changed_files = set()
+        self.removed_files = []
+        self.stages = []
+        self.current_stage = self.stage_stats(None)
+        self.started = None
+        self.duration = None
+        self.success = None
+
+    @staticmethod
+    def stage_stats(name):
+        """Empty measurements of a build stage"""
+        stats = {'name': name, 'wall_time': 0.0, 'cpu_time': 0.0, 'peak_rss': None}
+        stats.update((counter, 0) for counter in STAGE_COUNTERS)
+        return stats
+
+    @contextmanager
+    def stage(self, name):
+        """Measure a build stage
+
+        Wall and CPU time are taken around the stage; CPU time includes
+        the worker processes it ran. Files, bytes and cache hits are
+        added by the stage itself through count(). Peak RSS is the
+        highest of the main process so far and the stage's workers.
+        """
+        stats = self.current_stage = self.stage_stats(name)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield stats
+        finally:
+            stats['wall_time'] += time.perf_counter() - wall
+            stats['cpu_time'] += time.process_time() - cpu
+            self.count_rss(peak_rss())
+            self.stages.append(stats)
+            self.current_stage = self.stage_stats(None)
+
+    def count(self, **counters):
+        """Add to the counters of the current stage"""
+        for counter, value in counters.items():
+            self.current_stage[counter] += value
+
+    def count_rss(self, rss):
+        """Raise the peak RSS of the current stage"""
+        if rss is not None:
+            self.current_stage['peak_rss'] = max(self.current_stage['peak_rss'] or 0, rss)
+
+    def load_manifest(self):
+        """Load the manifest of the previous build, if it is usable"""
+        if self.clean or not self.manifest_path.exists():
+            return
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"  ℹ️  Ignoring unreadable build manifest: {e}")
+            return
+        if manifest.get('version') != MANIFEST_VERSION:
+            return
+        self.previous_files = manifest.get('files', {})
+        self.previous_package = manifest.get('package')
+
+    def save_manifest(self, package_path=None):
+        """Persist the manifest for the next incremental build"""
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'timestamp': self.timestamp,
+            'package': package_path.name if package_path else None,
+            'files': self.manifest_files,
+        }
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        self.count(files=1, bytes_out=self.manifest_path.stat().st_size)
+
+    def clean_build_dir(self):
+        """Clean the build directory"""
+        if self.build_dir.exists():
+            shutil.rmtree(self.build_dir)
+        self.build_dir.mkdir(parents=True, exist_ok=True)
+        print(f"✓ Cleaned build directory: {self.build_dir}")
+
+    def discover_sources(self):
+        """Find source files in a single directory walk
+
+        Excluded directories are pruned before they are entered, and the
+        stat() results cached by os.scandir are reused for change checks.
+        Returns a dict of relative POSIX path -> (path, size, mtime).
+        """
+        sources = {}
+        pending = [str(self.project_path)]
+        root_length = len(str(self.project_path)) + 1
+
+        while pending:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in EXCLUDED_DIRS:
+                            pending.append(entry.path)
+                    elif os.path.splitext(entry.name)[1].lower() in SOURCE_EXTENSIONS and entry.is_file():
+                        stat = entry.stat()
+                        key = entry.path[root_length:].replace(os.sep, '/')
+                        sources[key] = (entry.path, stat.st_size, stat.st_mtime)
+
+        return sources
+
+    def file_settings(self, key):
+        """Settings that affect the build output of a source file"""
+        ext = os.path.splitext(key)[1].lower()
+        settings = dict(TRANSFORM_SETTINGS.get(ext, {}))
+        if self.fingerprint and (should_fingerprint(key) or ext in REWRITE_EXTENSIONS):
+            settings['fingerprint'] = True
+        if self.image_optimization:
+            if ext in IMAGE_EXTENSIONS:
+                settings['image'] = IMAGE_SETTINGS
+            elif ext == '.html':
+                settings['images'] = {'encoder': IMAGE_SETTINGS['encoder'],
+                                      'sizes': self.image_sizes}
+        if self.critical_css and ext in ('.html', '.js'):
+            settings['critical_css'] = {'version': CRITICAL_VERSION, 'fold': self.fold_elements}
+        return settings
+
+    def make_task(self, key, path, previous=None):
+        """Create a worker task; previous is the reusable manifest entry"""
+        ext = os.path.splitext(key)[1].lower()
+        return {
+            'key': key,
+            'ext': ext,
+            'source': path,
+            'build_dir': str(self.build_dir),
+            'fingerprint': self.fingerprint and should_fingerprint(key),
+            'asset_map': None,
+            'image': IMAGE_SETTINGS if self.image_optimization and ext in IMAGE_EXTENSIONS else None,
+            'image_cache': str(self.cache_dir / 'images'),
+            'images': None,
+            'image_sizes': self.image_sizes,
+            'selectors': self.critical_css and ext in ('.html', '.js'),
+            'fold_elements': self.fold_elements,
+            'previous_hash': previous['hash'] if previous else None,
+            'previous_output': previous['output'] if previous else None,
+            'previous_output_size': previous.get('output_size') if previous else None,
+            'previous_image': previous.get('image') if previous else None,
+        }
+
+    def is_stale(self, entry, pending=()):
+        """Check whether a document references assets that were renamed
+
+        Pages also track the images they show, since their responsive
+        markup depends on the image even when names are not fingerprinted.
+        References to files in pending, whose new names are not known
+        yet, are left to the next round of the phase.
+        """
+        return (any(ref not in pending and self.asset_map.get(ref) != output
+                    for ref, output in entry.get('assets', {}).items())
+                or any(self.manifest_files.get(ref, {}).get('hash') != digest
+                       for ref, digest in entry.get('images', {}).items()))
+
+    def register_outputs(self, key, entry):
+        """Make a built file's output names known to later phases"""
+        if self.fingerprint and should_fingerprint(key):
+            self.asset_map[key] = entry['output']
+        image = entry.get('image')
+        if image:
+            self.image_map[key] = image
+            for variant in image['variants']:
+                self.image_variants.add(variant['key'])
+                if self.fingerprint:
+                    self.asset_map[variant['key']] = variant['output']
+
+    def plan_build(self, keys, sources):
+        """Compare sources against the manifest and create worker tasks
+
+        Files whose size, mtime and settings match the previous build are
+        skipped without being read, unless they reference an asset whose
+        fingerprinted name changed. Other files become tasks; when only
+        the mtime changed, the worker compares content hashes itself.
+        """
+        candidates = []
+        for key in keys:
+            path, size, mtime = sources[key]
+            settings = self.file_settings(key)
+            entry = {'size': size, 'mtime': mtime, 'settings': settings}
+            self.manifest_files[key] = entry
+
+            previous = self.previous_files.get(key)
+            if not (previous and previous.get('settings') == settings and 'output' in previous
+                    and all((self.build_dir / output).exists()
+                            for output in entry_outputs(previous))):
+                previous = None
+            elif previous.get('size') == size and previous.get('mtime') == mtime:
+                for field in ('hash', 'output', 'output_size', 'unhashed', 'assets', 'images',
+                              'image', 'selectors', 'critical'):
+                    if field in previous:
+                        entry[field] = previous[field]
+                self.register_outputs(key, entry)
+            candidates.append((key, path, previous))
+
+        # Checked once all unchanged names in this phase are known
+        pending = {key for key in keys if 'hash' not in self.manifest_files[key]}
+        tasks = []
+        for key, path, previous in candidates:
+            entry = self.manifest_files[key]
+            if 'hash' in entry and not self.is_stale(entry, pending):
+                continue
+            if previous and self.is_stale(previous, pending):
+                previous = None
+            entry.pop('hash', None)
+            tasks.append(self.make_task(key, path, previous))
+
+        return tasks
+
+    def run_tasks(self, tasks, worker=process_file):
+        """Run worker tasks, in parallel when there is enough work"""
+        if self.jobs <= 1 or len(tasks) <= 1:
+            for task in tasks:
+                yield worker(task)
+            return
+
+        chunksize = max(1, len(tasks) // (self.jobs * 4))
+        with ProcessPoolExecutor(max_workers=self.jobs, mp_context=pool_context()) as executor:
+            for result in executor.map(partial(measured, worker), tasks, chunksize=chunksize):
+                cpu_time, rss = result.pop('usage')
+                self.current_stage['cpu_time'] += cpu_time
+                self.count_rss(rss)
+                yield result
+
+    def remove_output(self, output):
+        """Delete a build output together with its precompressed sidecars"""
+        for path in [output] + [f"{output}.{fmt}" for fmt in SIDECAR_FORMATS]:
+            if (self.build_dir / path).exists():
+                (self.build_dir / path).unlink()
+
+    def record_result(self, result, asset_map):
+        """Store a worker result in the manifest; return True if it changed"""
+        key = result['key']
+        entry = self.manifest_files[key]
+        previous = self.previous_files.get(key, {})
+        replaced = set(entry_outputs(entry)) | set(entry_outputs(previous))
+
+        entry['hash'] = result['hash']
+        entry['output'] = result['output']
+        entry['output_size'] = result['bytes_out']
+        entry.pop('unhashed', None)
+        if entry['output'] != key:
+            entry['unhashed'] = key
+        entry.pop('image', None)
+        if result.get('image'):
+            entry['image'] = result['image']
+        if result.get('selectors'):
+            entry['selectors'] = result['selectors']
+        entry.pop('critical', None)
+        if not result['changed']:
+            # A kept output still carries the critical CSS inlined last time
+            # and was built against the names recorded last time
+            for field in ('critical', 'assets', 'images'):
+                if field in previous:
+                    entry[field] = previous[field]
+        elif asset_map is not None and os.path.splitext(key)[1].lower() in REWRITE_EXTENSIONS:
+            if self.fingerprint:
+                # Fingerprinted names this document was built against
+                entry['assets'] = {ref: asset_map.get(ref) for ref in result['references']
+                                   if should_fingerprint(ref)}
+            if self.image_optimization and key.lower().endswith('.html'):
+                # Images this page was built against
+                entry['images'] = {ref: self.manifest_files.get(ref, {}).get('hash')
+                                   for ref in result['references']
+                                   if os.path.splitext(ref)[1].lower() in IMAGE_EXTENSIONS
+                                   and ref not in self.image_variants}
+        self.register_outputs(key, entry)
+        if result.get('cache_hit'):
+            self.image_cache_hits += 1
+        self.count(files=1, bytes_in=result['bytes_in'],
+                   bytes_out=result['bytes_out'] if result['changed'] else 0,
+                   cache_hits=int(not result['changed'] or bool(result.get('cache_hit'))))
+        if not result['changed']:
+            return False
+
+        # Old fingerprinted names of a changed file are no longer referenced
+        for old_output in replaced - set(entry_outputs(entry)):
+            self.remove_output(old_output)
+
+        self.changed_files.add(key)
+        if result['error']:
+            print(f"  ✗ {key}: {result['error']}")
+            # Make the next build retry the file
+            entry['hash'] = None
+        else:
+            print(f"  ✓ {key}")
+        return True
+
+    def prepare_tasks(self, tasks):
+        """Hand the current asset and image maps to rewriting tasks
+
+        Returns the asset map the tasks are built against.
+        """
+        rewrite = self.fingerprint or self.image_optimization
+        asset_map = dict(self.asset_map) if rewrite else None
+        images = dict(self.image_map) if self.image_optimization else None
+        for task in tasks:
+            if task['ext'] in REWRITE_EXTENSIONS:
+                task['asset_map'] = asset_map
+            if task['ext'] == '.html':
+                task['images'] = images
+        return asset_map
+
+    def run_phase(self, keys, sources):
+        """Build a group of files against the current asset map
+
+        Stylesheets may reference each other (@import), so a document is
+        rebuilt when an asset it references got a new name later in the
+        same phase. The number of rounds is bounded to survive cycles.
+        """
+        tasks = self.plan_build(keys, sources)
+        skipped = len(keys) - len(tasks)
+        self.count(cache_hits=skipped)
+
+        for _ in range(len(keys) + 1):
+            if not tasks:
+                break
+            asset_map = self.prepare_tasks(tasks)
+            for result in self.run_tasks(tasks):
+                self.results.append(result)
+                if not self.record_result(result, asset_map):
+                    skipped += 1
+
+            tasks = [self.make_task(key, sources[key][0]) for key in keys
+                     if self.is_stale(self.manifest_files[key])]
+
+        return skipped
+
+    def process_sources(self):
+        """Copy, minify and fingerprint new and changed source files
+
+        Files are built in phases so that every reference can be
+        rewritten to a final name: images and other plain assets first,
+        then stylesheets (which reference fonts and images), then HTML
+        pages.
+        """
+        with self.stage('discover'):
+            sources = self.sources = self.discover_sources()
+            self.count(files=len(sources), bytes_in=sum(size for _, size, _ in sources.values()))
+
+        images, phases = [], ([], [], [])
+        for key in sorted(sources):
+            ext = os.path.splitext(key)[1].lower()
+            if ext in IMAGE_EXTENSIONS:
+                images.append(key)
+            else:
+                phases[{'.css': 1, '.html': 2}.get(ext, 0)].append(key)
+
+        # Images first: pages need their variants and dimensions
+        with self.stage('images'):
+            skipped = self.optimize_images(images, sources)
+
+        with self.stage('sources'):
+            print(f"\n📄 Processing source files ({self.jobs} job(s))...")
+            skipped += sum(self.run_phase(keys, sources) for keys in phases)
+            if skipped:
+                print(f"  ℹ️  {skipped} unchanged file(s) skipped")
+
+            self.write_asset_manifest()
+
+    def write_asset_manifest(self):
+        """Write the original -> fingerprinted name map for server tooling"""
+        path = self.build_dir / ASSET_MANIFEST_NAME
+        if not self.fingerprint:
+            if path.exists():
+                path.unlink()
+            return
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(dict(sorted(self.asset_map.items())), f, indent=2)
+        print(f"  ✓ {ASSET_MANIFEST_NAME} ({len(self.asset_map)} fingerprinted asset(s))")
+
+    def prune_stylesheet(self, css_key, tokens, rules):
+        """Write css_key without the rules no page can match
+
+        The pruned copy is a generated manifest entry (main.pruned.css),
+        so it is fingerprinted, compressed, packaged and cleaned up like
+        any other output. It is only rewritten when the stylesheet's
+        content, output or settings or the set of tokens in use changed.
+        Returns its manifest entry.
+        """
+        entry = self.manifest_files[css_key]
+        key = pruned_key(css_key)
+        # Output names stay the same under --no-fingerprint, so key on content
+        digest = hashlib.sha256(json.dumps(
+            [CRITICAL_VERSION, entry['hash'], entry['output'], entry['settings'],
+             sorted(tokens)]).encode('utf-8')).hexdigest()
+
+        previous = self.previous_files.get(key)
+        if (previous and previous.get('hash') == digest
+                and (self.build_dir / previous['output']).exists()):
+            self.manifest_files[key] = previous
+            self.count(cache_hits=1)
+            return previous
+
+        content = prune_css(self.parse_stylesheet(css_key, rules), tokens).encode('utf-8')
+        output_hash = hashlib.sha256(content).hexdigest()
+        output = fingerprint_name(key, output_hash) if self.fingerprint else key
+        with open(self.build_dir / output, 'wb') as f:
+            f.write(content)
+        if previous and previous.get('output') != output:
+            self.remove_output(previous['output'])
+
+        self.manifest_files[key] = {
+            'generated_from': css_key,
+            'settings': {},
+            'hash': digest,
+            'output': output,
+            'output_size': len(content),
+            'output_hash': output_hash,
+        }
+        self.changed_files.add(key)
+        self.count(files=1, bytes_in=entry['output_size'], bytes_out=len(content))
+        print(f"  ✓ {key} ({entry['output_size'] / 1024:.1f} KB -> {len(content) / 1024:.1f} KB)")
+        return self.manifest_files[key]
+
+    def parse_stylesheet(self, css_key, rules):
+        """Parse a built stylesheet once per build"""
+        if css_key not in rules:
+            output = self.build_dir / self.manifest_files[css_key]['output']
+            rules[css_key] = parse_css(output.read_text(encoding='utf-8'))
+        return rules[css_key]
+
+    def inline_critical_css(self):
+        """Prune unused CSS and inline each page's above-the-fold rules
+
+        Pages and scripts record the classes, ids and tags they use while
+        they are built. Every local stylesheet is pruned against the
+        tokens of all pages linking it plus the classes scripts toggle.
+        Each page then gets the rules matching its first elements in a
+        <style> block and loads the pruned stylesheet asynchronously.
+
+        Inlining edits the built page, so a page that was not rebuilt in
+        this build but links a pruned stylesheet whose name or content
+        changed is rebuilt from its source first.
+        """
+        print("\n🎨 Inlining critical CSS...")
+        if not self.critical_css:
+            print("  ℹ️  Critical CSS disabled")
+            return
+
+        stylesheets = {entry['output']: key for key, entry in self.manifest_files.items()
+                       if key.lower().endswith('.css') and 'generated_from' not in entry}
+        pages = sorted(key for key, entry in self.manifest_files.items()
+                       if key.lower().endswith('.html') and entry.get('selectors'))
+
+        # Classes scripts toggle apply to every page
+        shared = {'.' + name for name in self.css_safelist}
+        for key, entry in self.manifest_files.items():
+            if key.lower().endswith('.js'):
+                shared.update(entry.get('selectors', {}).get('used', []))
+
+        used = {}
+        for key in pages:
+            selectors = self.manifest_files[key]['selectors']
+            for output in selectors['stylesheets']:
+                if output in stylesheets:
+                    used.setdefault(stylesheets[output], set(shared)).update(selectors['used'])
+
+        rules = {}
+        pruned = {}
+        for css_key, tokens in sorted(used.items()):
+            pruned[css_key] = self.prune_stylesheet(css_key, tokens, rules)
+
+        # Pages record the pruned name and content hash they were inlined against
+        def linked(key):
+            return {output: [pruned[stylesheets[output]]['output'],
+                             pruned[stylesheets[output]]['output_hash']]
+                    for output in self.manifest_files[key]['selectors']['stylesheets']
+                    if output in stylesheets}
+
+        pending = [key for key in pages if key in self.changed_files
+                   or self.manifest_files[key].get('critical', {}).get('stylesheets') != linked(key)]
+        self.count(cache_hits=len(pages) - len(pending))
+
+        # Pages kept from the last build already have critical CSS inlined
+        rebuild = [self.make_task(key, self.sources[key][0])
+                   for key in pending if key not in self.changed_files]
+        if rebuild:
+            asset_map = self.prepare_tasks(rebuild)
+            for result in self.run_tasks(rebuild):
+                self.record_result(result, asset_map)
+
+        cache = {}
+        for key in pending:
+            entry = self.manifest_files[key]
+            links = {}
+            stats = {'stylesheets': linked(key), 'css_before': 0, 'css_blocking': 0, 'css_async': 0}
+            fold = frozenset(entry['selectors']['fold'])
+            for output, (pruned_output, _) in stats['stylesheets'].items():
+                css_key = stylesheets[output]
+                # Pages built from one template share their critical CSS
+                memo = (css_key, os.path.dirname(key), fold)
+                if memo not in cache:
+                    critical = critical_css(self.parse_stylesheet(css_key, rules), fold, css_key, key)
+                    cache[memo] = critical if len(critical.encode('utf-8')) <= MAX_CRITICAL_BYTES else None
+                links[output] = (pruned_output, cache[memo])
+
+                pruned_size = self.manifest_files[pruned_key(css_key)]['output_size']
+                stats['css_before'] += self.manifest_files[css_key]['output_size']
+                if cache[memo] is None:
+                    stats['css_blocking'] += pruned_size
+                else:
+                    stats['css_blocking'] += len(cache[memo].encode('utf-8'))
+                    stats['css_async'] += pruned_size
+
+            entry['critical'] = stats
+            if not links:
+                continue
+            path = self.build_dir / entry['output']
+            original = path.read_text(encoding='utf-8')
+            content = inline_critical(original, key, links).encode('utf-8')
+            self.count(files=1, bytes_in=len(original.encode('utf-8')), bytes_out=len(content))
+            with open(str(path) + '.tmp', 'wb') as f:
+                f.write(content)
+            os.replace(str(path) + '.tmp', path)
+            entry['output_size'] = len(content)
+            self.changed_files.add(key)
+
+        rewritten = sum(pruned_key(css_key) in self.changed_files for css_key in pruned)
+        print(f"  ✓ {rewritten} of {len(pruned)} stylesheet(s) re-pruned, "
+              f"{len(pending)} page(s) updated")
+
+    def remove_stale_files(self):
+        """Remove build outputs whose source files were deleted"""
+        self.removed_files = sorted(set(self.previous_files) - set(self.manifest_files))
+        if not self.removed_files:
+            return
+
+        print("\n🧹 Removing deleted files...")
+        self.count(files=len(self.removed_files))
+        for key in self.removed_files:
+            outputs = entry_outputs(self.previous_files[key]) or [key]
+            for output in outputs:
+                self.remove_output(output)
+            # Drop directories left empty by the removal
+            parent = (self.build_dir / outputs[0]).parent
+            while parent != self.build_dir and parent.exists() and not any(parent.iterdir()):
+                parent.rmdir()
+                parent = parent.parent
+            print(f"  ✓ {key}")
+
+    def compression_settings(self):
+        """Settings that affect the precompressed sidecars"""
+        return {'level': 9, 'brotli': brotli is not None, 'max_ratio': self.compress_ratio}
+
+    def compress_outputs(self):
+        """Precompress text outputs for gzip_static/brotli_static serving
+
+        Only outputs that changed in this build, or whose compression
+        settings changed, are recompressed.
+        """
+        print("\n🗜️  Precompressing text assets...")
+
+        if not self.compress:
+            for key, entry in self.manifest_files.items():
+                for fmt in SIDECAR_FORMATS:
+                    sidecar = self.build_dir / f"{entry['output']}.{fmt}"
+                    if sidecar.exists():
+                        sidecar.unlink()
+                        self.compressed_count += 1
+            print("  ℹ️  Precompression disabled")
+            return
+
+        if brotli is None:
+            print("  ℹ️  brotli module not installed, writing .gz only (pip install brotli)")
+
+        settings = self.compression_settings()
+        tasks = []
+        for key, entry in sorted(self.manifest_files.items()):
+            if os.path.splitext(entry['output'])[1].lower() not in COMPRESS_EXTENSIONS:
+                continue
+            previous = self.previous_files.get(key, {}).get('compressed')
+            if (key not in self.changed_files and previous
+                    and previous.get('settings') == settings
+                    and all((self.build_dir / f"{entry['output']}.{fmt}").exists()
+                            for fmt in SIDECAR_FORMATS if previous.get(fmt))):
+                entry['compressed'] = previous
+                continue
+            tasks.append({
+                'key': key,
+                'path': str(self.build_dir / entry['output']),
+                'brotli': settings['brotli'],
+                'max_ratio': settings['max_ratio'],
+            })
+
+        for result in self.run_tasks(tasks, compress_file):
+            entry = self.manifest_files[result['key']]
+            entry['compressed'] = {'settings': settings, 'gz': result['gz'], 'br': result['br']}
+            self.compressed_count += 1
+            self.count(files=1, bytes_in=result['raw'],
+                       bytes_out=sum(result[fmt] or 0 for fmt in SIDECAR_FORMATS))
+
+        print(f"  ✓ {len(tasks)} file(s) compressed")
+        skipped = sum(1 for entry in self.manifest_files.values() if 'compressed' in entry) - len(tasks)
+        self.count(cache_hits=skipped)
+        if skipped:
+            print(f"  ℹ️  {skipped} unchanged file(s) skipped")
+
+    def optimize_images(self, keys, sources):
+        """Re-encode raster images and write their responsive variants
+
+        Each image gets a quality-limited re-encode, narrower width
+        variants and WebP copies (see images.py). Encoded files are cached
+        by content hash in .build-cache/, which survives --clean, so an
+        image is only encoded again when its bytes or the settings change.
+        Returns the number of unchanged images skipped.
+        """
+        print(f"\n🖼️  Optimizing images ({self.jobs} job(s))...")
+
+        if keys and not self.image_optimization:
+            if Image is None:
+                print("  ℹ️  Pillow not installed, copying images unchanged (pip install Pillow)")
+            else:
+                print("  ℹ️  Image optimization disabled, copying images unchanged")
+
+        skipped = self.run_phase(keys, sources)
+        if self.image_cache_hits:
+            print(f"  ℹ️  {self.image_cache_hits} image(s) restored from the build cache")
+        return skipped
+
+    def create_deployment_package(self):
+        """Create deployment package (zip)"""
+        print("\n📦 Creating deployment package...")
+
+        # Reuse the previous package when nothing changed
+        if (not self.changed_files and not self.removed_files and not self.compressed_count
+                and self.previous_package):
+            previous = self.project_path / self.previous_package
+            if previous.exists():
+                print(f"  ℹ️  No changes, reusing: {previous.name}")
+                self.count(cache_hits=1)
+                return previous
+
+        try:
+            import zipfile
+
+            zip_name = f"website_{self.timestamp}.zip"
+            zip_path = self.project_path / zip_name
+
+            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                outputs = []
+                for entry in self.manifest_files.values():
+                    outputs.extend(entry_outputs(entry))
+                    compressed = entry.get('compressed', {})
+                    outputs.extend(f"{entry['output']}.{fmt}" for fmt in SIDECAR_FORMATS
+                                   if compressed.get(fmt))
+                if self.fingerprint:
+                    outputs.append(ASSET_MANIFEST_NAME)
+                for output in sorted(outputs):
+                    zipf.write(self.build_dir / output, output)
+
+            self.count(files=len(outputs), bytes_out=zip_path.stat().st_size)
+            print(f"  ✓ Created: {zip_name}")
+            return zip_path
+        except Exception as e:
+            print(f"  ✗ Error creating package: {e}")
+            return None
+
+    def build_summary(self):
+        """Machine-readable build results: totals and per-stage measurements"""
+        counts = {}
+        for key, entry in self.manifest_files.items():
+            if 'generated_from' in entry:
+                continue
+            ext = os.path.splitext(key)[1].lower()
+            counts[ext] = counts.get(ext, 0) + 1
+
+        # Images count with all their variants
+        total_size = sum(entry['image']['bytes'] if 'image' in entry else entry.get('output_size') or 0
+                         for entry in self.manifest_files.values())
+        processed = [r for r in self.results if r['changed']]
+        rss = [stats['peak_rss'] for stats in self.stages if stats['peak_rss'] is not None]
+
+        return {
+            'project': str(self.project_path),
+            'timestamp': self.timestamp,
+            'success': self.success,
+            'settings': {
+                'jobs': self.jobs,
+                'clean': self.clean,
+                'fingerprint': self.fingerprint,
+                'compress': self.compress,
+                'images': self.image_optimization,
+                'critical_css': self.critical_css,
+            },
+            'duration': self.duration,
+            'cpu_time': sum(stats['cpu_time'] for stats in self.stages),
+            'peak_rss': max(rss) if rss else None,
+            'files': {
+                'html': counts.get('.html', 0),
+                'css': counts.get('.css', 0),
+                'js': counts.get('.js', 0),
+                'images': sum(counts.get(ext, 0) for ext in IMAGE_EXTENSIONS),
+                'total': sum(counts.values()),
+            },
+            'total_size': total_size,
+            'changed_files': len(self.changed_files),
+            'removed_files': len(self.removed_files),
+            'bytes_in': sum(r['bytes_in'] for r in processed),
+            'bytes_out': sum(r['bytes_out'] for r in processed),
+            'cache_hits': sum(stats['cache_hits'] for stats in self.stages),
+            'stages': self.stages,
+        }
+
+    def generate_build_report(self):
+        """Generate build report from the manifest and per-file results"""
+        summary = self.build_summary()
+        print("\n📊 Build Report:")
+        print("=" * 50)
+
+        print(f"  HTML Files: {summary['files']['html']}")
+        print(f"  CSS Files: {summary['files']['css']}")
+        print(f"  JavaScript Files: {summary['files']['js']}")
+        print(f"  Image Files: {summary['files']['images']}")
+        print(f"  Total Size: {summary['total_size'] / (1024 * 1024):.2f} MB")
+        print(f"  Changed Files: {summary['changed_files']}")
+        print(f"  Removed Files: {summary['removed_files']}")
+        print(f"  Processed: {summary['bytes_in'] / 1024:.1f} KB -> {summary['bytes_out'] / 1024:.1f} KB")
+
+        processed = [r for r in self.results if r['changed']]
+
+        optimized = [r for r in processed if r.get('image')]
+        if optimized:
+            original = sum(r['bytes_in'] for r in optimized)
+            main = sum(r['bytes_out'] for r in optimized)
+            variants = sum(len(r['image']['variants']) for r in optimized)
+            print(f"  Images: {len(optimized)} optimized, {original / 1024:.1f} KB -> "
+                  f"{main / 1024:.1f} KB, {variants} variant(s)")
+
+        # Render-blocking local CSS per page, before and after inlining
+        savings = [(key, entry['critical']) for key, entry in sorted(self.manifest_files.items())
+                   if entry.get('critical', {}).get('css_before')]
+        if savings:
+            print("  Blocking CSS per page (before -> inline critical + async pruned):")
+            for key, stats in savings[:20]:
+                print(f"    {key[-36:]:<36} {stats['css_before'] / 1024:7.1f} KB -> "
+                      f"{stats['css_blocking'] / 1024:.1f} KB + {stats['css_async'] / 1024:.1f} KB")
+            if len(savings) > 20:
+                print(f"    ... and {len(savings) - 20} more page(s)")
+            before = sum(stats['css_before'] for _, stats in savings)
+            blocking = sum(stats['css_blocking'] for _, stats in savings)
+            print(f"    {'Total saved':<36} {(before - blocking) / 1024:7.1f} KB "
+                  f"({1 - blocking / before:.0%})")
+
+        # Raw and precompressed totals per type; files without a sidecar
+        # are served uncompressed
+        compression = {}
+        for entry in self.manifest_files.values():
+            if 'compressed' not in entry:
+                continue
+            raw = entry.get('output_size') or 0
+            totals = compression.setdefault(os.path.splitext(entry['output'])[1].lower(), [0, 0, 0])
+            totals[0] += raw
+            totals[1] += entry['compressed']['gz'] or raw
+            totals[2] += entry['compressed']['br'] or raw
+        if compression:
+            print("  Compression (raw -> gzip / brotli):")
+            for ext, (raw, gz, br) in sorted(compression.items()):
+                brotli_total = f"{br / 1024:.1f} KB" if brotli else "n/a"
+                print(f"    {ext:<6} {raw / 1024:8.1f} KB -> {gz / 1024:.1f} KB / {brotli_total}")
+
+        # Where the time went; CPU time includes worker processes
+        print(f"  {'Stage':<14} {'Wall':>7} {'CPU':>7} {'Files':>6} {'Hits':>6} "
+              f"{'In MB':>7} {'Out MB':>7}")
+        for stats in summary['stages']:
+            print(f"  {stats['name']:<14} {stats['wall_time']:>6.2f}s {stats['cpu_time']:>6.2f}s "
+                  f"{stats['files']:>6} {stats['cache_hits']:>6} "
+                  f"{stats['bytes_in'] / (1024 * 1024):>7.2f} {stats['bytes_out'] / (1024 * 1024):>7.2f}")
+        rss = f"{summary['peak_rss'] / (1024 * 1024):.1f} MB" if summary['peak_rss'] else "n/a"
+        print(f"  Build Time: {summary['duration']:.2f}s "
+              f"(CPU {summary['cpu_time']:.2f}s, peak RSS {rss})")
+        print("=" * 50)
+
+    def build(self):
+        """Run the complete build process"""
+        print(f"\n🚀 Starting website build...")
+        print(f"Project: {self.project_path}")
+        print(f"Build Directory: {self.build_dir}")
+        self.started = time.perf_counter()
+
+        try:
+            with self.stage('prepare'):
+                self.load_manifest()
+
+                # Clean build directory on full rebuilds only
+                if self.previous_files:
+                    print("✓ Incremental build (use --clean for a full rebuild)")
+                else:
+                    self.clean_build_dir()
+
+            # Optimize images, copy and minify changed sources
+            self.process_sources()
+
+            # Prune stylesheets and inline critical CSS into pages
+            with self.stage('critical_css'):
+                self.inline_critical_css()
+
+            # Drop outputs of deleted sources
+            with self.stage('cleanup'):
+                self.remove_stale_files()
+
+            # Write .gz/.br sidecars for changed text outputs
+            with self.stage('compress'):
+                self.compress_outputs()
+
+            # Create deployment package
+            package_path = None
+            if self.package:
+                with self.stage('package'):
+                    package_path = self.create_deployment_package()
+
+            # Record inputs for the next incremental build
+            with self.stage('manifest'):
+                self.save_manifest(package_path)
+
+            self.duration = time.perf_counter() - self.started
+            self.success = True
+
+            # Generate report
+            self.generate_build_report()
+
+            print("\n✅ Build completed successfully!")
+            return True
+
+        except Exception as e:
+            self.duration = time.perf_counter() - self.started
+            self.success = False
+            print(f"\n❌ Build failed: {e}")
+            return False
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Build a static website into dist/')
+    parser.add_argument('project_path', nargs='?', default='.',
+                        help='project directory (default: current directory)')
+    parser.add_argument('--clean', action='store_true',
+                        help='ignore the build manifest and rebuild everything')
+    parser.add_argument('--jobs', '-j', type=int, default=None, metavar='N',
+                        help='number of worker processes (default: CPU count)')
+    parser.add_argument('--no-fingerprint', dest='fingerprint', action='store_false',
+                        help='keep original asset names instead of content-hashed ones')
+    parser.add_argument('--no-compress', dest='compress', action='store_false',
+                        help='do not write precompressed .gz/.br sidecars')
+    parser.add_argument('--compress-ratio', type=float, default=0.9, metavar='R',
+                        help='keep a sidecar only if it is at most R times the original size '
+                             '(default: 0.9)')
+    parser.add_argument('--no-images', dest='images', action='store_false',
+                        help='copy images unchanged instead of writing optimized variants')
+    parser.add_argument('--image-sizes', default=DEFAULT_SIZES, metavar='SIZES',
+                        help=f'sizes attribute for responsive <img> tags (default: "{DEFAULT_SIZES}")')
+    parser.add_argument('--no-critical-css', dest='critical', action='store_false',
+                        help='keep stylesheets unpruned and render-blocking')
+    parser.add_argument('--css-safelist', default='', metavar='CLASSES',
+                        help='comma-separated classes never pruned (e.g. added by third-party JS)')
+    parser.add_argument('--report', choices=('text', 'json'), default='text',
+                        help='json: print the build summary as JSON on stdout and progress '
+                             'on stderr (default: text)')
+    args = parser.parse_args()
+
+    builder = WebsiteBuilder(args.project_path, clean=args.clean, jobs=args.jobs,
+                             fingerprint=args.fingerprint, compress=args.compress,
+                             compress_ratio=args.compress_ratio, images=args.images,
+                             image_sizes=args.image_sizes, critical=args.critical,
+                             css_safelist=[name.strip().lstrip('.')
+                                           for name in args.css_safelist.split(',') if name.strip()])
+    if args.report == 'json':
+        # Keep stdout parseable
+        with redirect_stdout(sys.stderr):
+            success = builder.build()
+        json.dump(builder.build_summary(), sys.stdout, indent=2)
+        print()
+    else:
+        success = builder.build()
+
+    sys.exit(0 if success else 1)
+
+
+if __name__ == '__main__':
+    main()
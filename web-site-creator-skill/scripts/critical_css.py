@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Critical CSS Helpers
+
+Unused-selector pruning and critical CSS inlining, used by build.py:
+- Collects the tags, classes and ids each page uses, and those of its
+  first FOLD_ELEMENTS elements (the above-the-fold part)
+- Collects classes that scripts add or toggle (classList, className,
+  class="..." in markup strings)
+- Drops style rules whose selectors cannot match anything used
+- Inlines the rules matching above-the-fold elements in a <style> block
+  and loads the full stylesheet asynchronously
+
+Matching is conservative: combinators, pseudo-classes and attribute
+selectors are ignored, so a rule is only dropped when it names a class,
+id or tag that never occurs.
+"""
+
+import re
+import posixpath
+from html.parser import HTMLParser
+
+from fingerprint import rebase_css, resolve_reference
+from images import parse_attributes
+
+# Elements of <body> treated as above the fold
+FOLD_ELEMENTS = 150
+
+# Stylesheets whose critical subset is larger are not inlined
+MAX_CRITICAL_BYTES = 50 * 1024
+
+# Bump to rebuild pages and stylesheets after changing the rules below
+CRITICAL_VERSION = 'critical-1'
+
+# Classes added at runtime by Bootstrap and similar libraries
+SAFELIST = {
+    'active', 'show', 'showing', 'hiding', 'fade', 'collapse', 'collapsing',
+    'disabled', 'open', 'modal-open', 'modal-backdrop', 'offcanvas-backdrop',
+    'was-validated', 'is-valid', 'is-invalid', 'tooltip', 'popover',
+}
+
+# Always present, even when a page omits them
+ALWAYS_USED = {'html', 'head', 'body'}
+
+# At-rules whose body is a list of rules
+GROUPING_AT_RULES = {'@media', '@supports', '@document', '@layer', '@container'}
+
+_LINK_TAG = re.compile(r'''<link\b(?:[^>"']|"[^"]*"|'[^']*')*>''', re.IGNORECASE)
+_HREF = re.compile(r'''(\shref\s*=\s*)(["']?)([^"'\s>]*)\2''', re.IGNORECASE)
+
+_PSEUDO_FUNCTION = re.compile(r'(?<!\\)::?[\w-]+\([^()]*\)')
+_PSEUDO = re.compile(r'(?<!\\)::?[\w-]+')
+_ATTRIBUTE_SELECTOR = re.compile(r'\[[^\]]*\]')
+_CLASS = re.compile(r'\.((?:[\w-]|\\[0-9a-fA-F]{1,6}\s?|\\.)+)')
+_ID = re.compile(r'#((?:[\w-]|\\[0-9a-fA-F]{1,6}\s?|\\.)+)')
+_TAG = re.compile(r'(?:^|[\s>+~])([a-zA-Z][\w-]*)')
+_ESCAPE = re.compile(r'\\([0-9a-fA-F]{1,6}\s?|.)')
+_HEX_ESCAPE = re.compile(r'^[0-9a-fA-F]{1,6}\s?$')
+
+_JS_CLASS_LIST = re.compile(
+    r'classList\s*\.\s*(?:add|remove|toggle|replace|contains)\s*\(([^)]*)\)')
+_JS_CLASS_NAME = re.compile(r'''className\s*\+?=\s*(["'`])((?:(?!\1).)*)\1''')
+_JS_SET_CLASS = re.compile(
+    r'''setAttribute\(\s*["']class["']\s*,\s*(["'`])((?:(?!\1).)*)\1''')
+_JS_MARKUP_CLASS = re.compile(r'''\sclass\s*=\s*\\?["']([^"'\\]*)''')
+_JS_CREATE = re.compile(r'''createElement\(\s*["'`]([a-zA-Z][\w-]*)["'`]''')
+_JS_STRING = re.compile(r'''(["'`])((?:\\.|(?!\1).)*)\1''')
+_CLASS_NAME = re.compile(r'^-?[_a-zA-Z][\w:/.-]*$')
+
+
+def class_tokens(value):
+    """Turn a class attribute value into '.name' tokens"""
+    return {'.' + name for name in value.split() if _CLASS_NAME.match(name)}
+
+
+def script_tokens(script):
+    """Classes and tags a script can add to the page"""
+    tokens = set()
+    for match in _JS_CLASS_LIST.finditer(script):
+        for string in _JS_STRING.finditer(match.group(1)):
+            tokens |= class_tokens(string.group(2))
+    for pattern in (_JS_CLASS_NAME, _JS_SET_CLASS):
+        for match in pattern.finditer(script):
+            tokens |= class_tokens(re.sub(r'\$\{[^}]*\}', ' ', match.group(2)))
+    for match in _JS_MARKUP_CLASS.finditer(script):
+        tokens |= class_tokens(re.sub(r'\$\{[^}]*\}', ' ', match.group(1)))
+    tokens |= {tag.lower() for tag in _JS_CREATE.findall(script)}
+    return tokens
+
+
+class SelectorCollector(HTMLParser):
+    """Collect the selector tokens a page uses and its stylesheet links"""
+
+    def __init__(self, page_key, fold_elements=FOLD_ELEMENTS):
+        super().__init__(convert_charrefs=True)
+        self.page_key = page_key
+        self.fold_elements = fold_elements
+        self.used = set(ALWAYS_USED)
+        self.fold = set(ALWAYS_USED)
+        self.stylesheets = []
+        self.body_elements = 0
+        self.in_body = False
+        self.script = None
+
+    def handle_starttag(self, tag, attrs):
+        tokens = {tag}
+        attributes = dict(attrs)
+        if attributes.get('class'):
+            tokens |= class_tokens(attributes['class'])
+        if attributes.get('id'):
+            tokens.add('#' + attributes['id'].strip())
+        self.used |= tokens
+
+        if tag == 'body':
+            self.in_body = True
+        if not self.in_body or self.body_elements < self.fold_elements:
+            self.fold |= tokens
+        if self.in_body:
+            self.body_elements += 1
+
+        if tag == 'link' and 'stylesheet' in (attributes.get('rel') or '').lower().split():
+            resolved, _ = resolve_reference(attributes.get('href') or '', self.page_key)
+            if resolved:
+                self.stylesheets.append(resolved)
+        elif tag == 'script' and not attributes.get('src'):
+            self.script = []
+
+    def handle_data(self, data):
+        if self.script is not None:
+            self.script.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == 'script' and self.script is not None:
+            self.used |= script_tokens(''.join(self.script))
+            self.script = None
+
+
+def collect_selectors(content, key, fold_elements=FOLD_ELEMENTS):
+    """Return the selector tokens used by a built page or script
+
+    Pages yield {'used', 'fold', 'stylesheets'}, scripts {'used'}.
+    Tokens are tag names, '.class' and '#id'.
+    """
+    if key.lower().endswith('.js'):
+        return {'used': sorted(script_tokens(content))}
+    collector = SelectorCollector(key, fold_elements)
+    collector.feed(content)
+    collector.close()
+    return {
+        'used': sorted(collector.used),
+        'fold': sorted(collector.fold),
+        'stylesheets': collector.stylesheets,
+    }
+
+
+def parse_css(text):
+    """Parse a stylesheet into a list of (prelude, body) rules
+
+    body is a list of rules for grouping at-rules (@media, @supports,
+    ...), the declaration text for other blocks and None for statements
+    such as @import. /*! comments are kept as statements.
+    """
+    rules, _ = _parse_block(text, 0)
+    return rules
+
+
+def _parse_block(text, i):
+    rules = []
+    length = len(text)
+    while i < length:
+        char = text[i]
+        if char.isspace():
+            i += 1
+        elif text.startswith('/*', i):
+            end = text.find('*/', i + 2)
+            end = length if end == -1 else end + 2
+            if text.startswith('/*!', i):
+                rules.append((text[i:end], None))
+            i = end
+        elif char == '}':
+            return rules, i + 1
+        else:
+            prelude, i, terminator = _scan(text, i, '{;}')
+            if terminator != '{':
+                if prelude:
+                    rules.append((prelude, None))
+                if terminator == '}':
+                    return rules, i + 1
+                i += 1
+                continue
+            at_keyword = (prelude.split('(')[0].split() or [''])[0].lower()
+            if at_keyword in GROUPING_AT_RULES:
+                body, i = _parse_block(text, i + 1)
+            else:
+                body, i = _scan_block(text, i + 1)
+            rules.append((prelude, body))
+    return rules, i
+
+
+def _scan(text, i, stops):
+    """Read up to a top-level stop character, skipping strings, comments and parens
+
+    Returns (stripped text, index of the stop character, stop character).
+    """
+    start = i
+    depth = 0
+    length = len(text)
+    while i < length:
+        char = text[i]
+        if char in '"\'':
+            i = _skip_string(text, i)
+            continue
+        if text.startswith('/*', i):
+            end = text.find('*/', i + 2)
+            i = length if end == -1 else end + 2
+            continue
+        if char == '\\':
+            i += 2
+            continue
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth = max(0, depth - 1)
+        elif depth == 0 and char in stops:
+            return text[start:i].strip(), i, char
+        i += 1
+    return text[start:].strip(), length, None
+
+
+def _scan_block(text, i):
+    """Read a declaration block up to its closing brace"""
+    start = i
+    depth = 0
+    length = len(text)
+    while i < length:
+        char = text[i]
+        if char in '"\'':
+            i = _skip_string(text, i)
+            continue
+        if char == '\\':
+            i += 2
+            continue
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            if depth == 0:
+                return text[start:i].strip(), i + 1
+            depth -= 1
+        i += 1
+    return text[start:].strip(), length
+
+
+def _skip_string(text, i):
+    quote = text[i]
+    i += 1
+    while i < len(text) and text[i] != quote:
+        if text[i] == '\\':
+            i += 1
+        elif text[i] == '\n':
+            break
+        i += 1
+    return i + 1
+
+
+def split_selectors(prelude):
+    """Split a selector list on top-level commas"""
+    selectors = []
+    while prelude:
+        selector, i, terminator = _scan(prelude, 0, ',')
+        if selector:
+            selectors.append(selector)
+        prelude = prelude[i + 1:] if terminator else ''
+    return selectors
+
+
+def _unescape(name):
+    """Resolve CSS escapes in an identifier: md\\:flex -> md:flex"""
+    def replace(match):
+        value = match.group(1)
+        if _HEX_ESCAPE.match(value):
+            try:
+                return chr(int(value, 16))
+            except (ValueError, OverflowError):
+                return '\ufffd'
+        return value
+    return _ESCAPE.sub(replace, name)
+
+
+def selector_matches(selector, tokens):
+    """Check whether a selector can match given the tokens in use"""
+    previous = None
+    while previous != selector:
+        previous = selector
+        selector = _PSEUDO_FUNCTION.sub('', selector)
+    selector = _ATTRIBUTE_SELECTOR.sub('', _PSEUDO.sub('', selector))
+
+    for name in _CLASS.findall(selector):
+        if '.' + _unescape(name) not in tokens:
+            return False
+    for name in _ID.findall(selector):
+        if '#' + _unescape(name) not in tokens:
+            return False
+    # Class and id names may look like tags, so drop them first
+    selector = _ID.sub('', _CLASS.sub('', selector))
+    return all(tag.lower() in tokens for tag in _TAG.findall(selector))
+
+
+def filter_rules(rules, tokens, critical=False):
+    """Keep the rules whose selectors can match; returns rules
+
+    Other at-rules (@font-face, @keyframes, @import, ...) are kept when
+    pruning and dropped when extracting critical rules.
+    """
+    kept = []
+    for prelude, body in rules:
+        if isinstance(body, list):
+            inner = filter_rules(body, tokens, critical)
+            if inner:
+                kept.append((prelude, inner))
+        elif prelude.startswith(('@', '/*')) or body is None:
+            if not critical:
+                kept.append((prelude, body))
+        else:
+            selectors = [s for s in split_selectors(prelude) if selector_matches(s, tokens)]
+            if selectors:
+                kept.append((','.join(selectors), body))
+    return kept
+
+
+def serialize(rules):
+    """Turn parsed rules back into compact CSS text"""
+    parts = []
+    for prelude, body in rules:
+        if body is None:
+            parts.append(prelude if prelude.startswith('/*') else prelude + ';')
+        elif isinstance(body, list):
+            parts.append(f"{prelude}{{{serialize(body)}}}")
+        else:
+            parts.append(f"{prelude}{{{body}}}")
+    return ''.join(parts)
+
+
+def prune_css(rules, tokens):
+    """Return the stylesheet without rules that cannot match"""
+    return serialize(filter_rules(rules, tokens))
+
+
+def critical_css(rules, tokens, css_key, page_key):
+    """Return the rules for above-the-fold tokens, ready to inline in page_key"""
+    return rebase_css(serialize(filter_rules(rules, tokens, critical=True)), css_key, page_key)
+
+
+def inline_critical(content, page_key, stylesheets):
+    """Inline critical CSS and load the pruned stylesheets asynchronously
+
+    stylesheets maps the build paths of linked stylesheets to
+    (pruned stylesheet path, critical CSS or None). Stylesheets without
+    critical CSS (too large, or a media other than screen) keep a
+    blocking link to the pruned file. The <style> block is placed where
+    the first asynchronous stylesheet was linked, so the cascade order
+    is unchanged.
+    """
+    styles = []
+    marker = '\0critical-css\0'
+
+    def replace(match):
+        tag = match.group()
+        attributes = parse_attributes(tag)
+        if 'stylesheet' not in attributes.get('rel', '').lower().split():
+            return tag
+        href = attributes.get('href', '').strip()
+        resolved, suffix = resolve_reference(href, page_key)
+        if resolved not in stylesheets:
+            return tag
+
+        pruned, critical = stylesheets[resolved]
+        path = href[:len(href) - len(suffix)]
+        url = path[:len(path) - len(posixpath.basename(path))] + posixpath.basename(pruned) + suffix
+        link = _HREF.sub(lambda m: m.group(1) + m.group(2) + url + m.group(2), tag, count=1)
+        if critical is None or attributes.get('media', 'all').strip().lower() not in ('all', 'screen'):
+            return link
+
+        styles.append(critical.replace('</', '<\\/'))
+        preload = (f'<link rel="preload" href="{url}" as="style" '
+                   f'onload="this.onload=null;this.rel=\'stylesheet\'">'
+                   f'<noscript>{link}</noscript>')
+        return (marker if len(styles) == 1 else '') + preload
+
+    content = _LINK_TAG.sub(replace, content)
+    css = ''.join(styles)
+    return content.replace(marker, f"<style>{css}</style>" if css else '', 1)
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Delta Deployment Engine
+
+Uploads only what changed since the last deployment, used by deploy.py:
+- Compares content hashes of dist/ with a manifest stored at the remote
+- Uploads new assets before the HTML pages that reference them
+- Deletes removed files last, then writes the new manifest
+- Runs uploads in parallel over a pool of reused connections
+- Uploads to a temporary name and renames, so no file is served half-written
+
+Targets:
+- DirectoryTarget: a local or mounted directory
+- FTPTarget: an FTP server (ftplib)
+
+The manifest lists every deployed file, so it is best kept outside the
+public tree (manifest_path); otherwise the web server must deny it.
+A DirectoryTarget can also scan its own contents instead of keeping a
+manifest, which is what GitHub Pages deployments use.
+
+A deployment interrupted halfway leaves the old manifest in place, so
+the next run simply uploads the remaining differences again.
+"""
+
+import io
+import os
+import json
+import ftplib
+import shutil
+import hashlib
+import posixpath
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+# Manifest of deployed paths and content hashes, stored at the remote root
+REMOTE_MANIFEST_NAME = '.deploy-manifest.json'
+REMOTE_MANIFEST_VERSION = 1
+
+# Build bookkeeping that is never deployed
+LOCAL_ONLY_FILES = {'.build-manifest.json'}
+
+# Pages go last so they never reference assets that are not uploaded yet
+PAGE_EXTENSIONS = {'.html', '.htm'}
+
+
+def hash_file(path):
+    """Return the SHA-256 hex digest of a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_local_manifest(build_dir):
+    """Map every deployable file in build_dir to its content hash"""
+    files = {}
+    root = str(build_dir)
+    pending = [root]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name != '.git':
+                        pending.append(entry.path)
+                elif entry.is_file():
+                    key = os.path.relpath(entry.path, root).replace(os.sep, '/')
+                    if key not in LOCAL_ONLY_FILES and key != REMOTE_MANIFEST_NAME:
+                        files[key] = hash_file(entry.path)
+    return files
+
+
+def is_page(path):
+    """Check whether a path is an HTML page or one of its sidecars"""
+    if path.endswith(('.gz', '.br')):
+        path = path[:-3]
+    return posixpath.splitext(path)[1].lower() in PAGE_EXTENSIONS
+
+
+def plan_deployment(local, remote):
+    """Split the differences between two manifests into ordered steps
+
+    Returns (assets, pages, deletions): changed non-HTML files, changed
+    HTML files and files that only exist at the remote.
+    """
+    changed = sorted(path for path, digest in local.items() if remote.get(path) != digest)
+    assets = [path for path in changed if not is_page(path)]
+    pages = [path for path in changed if is_page(path)]
+    deletions = sorted(set(remote) - set(local))
+    return assets, pages, deletions
+
+
+class ConnectionPool:
+    """Hands out reusable connections, opening at most `size` of them
+
+    A connection that raised may be left mid-transfer, so it is closed
+    instead of returned; the next caller opens a fresh one.
+    """
+
+    def __init__(self, target, size):
+        self.target = target
+        self.size = size
+        self.idle = []
+        self.opened = []
+        # Connections opened or being opened
+        self.count = 0
+        self.available = threading.Condition()
+
+    def acquire(self):
+        with self.available:
+            while not self.idle and self.count >= self.size:
+                self.available.wait()
+            if self.idle:
+                return self.idle.pop()
+            self.count += 1
+        try:
+            connection = self.target.connect()
+        except Exception:
+            with self.available:
+                self.count -= 1
+                self.available.notify()
+            raise
+        with self.available:
+            self.opened.append(connection)
+        return connection
+
+    def release(self, connection):
+        with self.available:
+            self.idle.append(connection)
+            self.available.notify()
+
+    def discard(self, connection):
+        with self.available:
+            self.opened.remove(connection)
+            self.count -= 1
+            self.available.notify()
+        try:
+            self.target.disconnect(connection)
+        except Exception:
+            pass
+
+    @contextmanager
+    def connection(self):
+        """Lend a connection, discarding it if the caller raises"""
+        connection = self.acquire()
+        try:
+            yield connection
+        except BaseException:
+            self.discard(connection)
+            raise
+        self.release(connection)
+
+    def close(self):
+        for connection in self.opened:
+            try:
+                self.target.disconnect(connection)
+            except Exception:
+                pass
+        self.opened = []
+        self.idle = []
+        self.count = 0
+
+
+class DirectoryTarget:
+    """Deploy into a directory on the local file system
+
+    The manifest is kept at manifest_path (default: inside the
+    directory). With scan=True no manifest is kept at all: the deployed
+    state is read by hashing the directory, which is always exact.
+    """
+
+    def __init__(self, path, manifest_path=None, scan=False):
+        self.root = os.path.abspath(path)
+        self.manifest_path = (os.path.abspath(manifest_path) if manifest_path
+                              else os.path.join(self.root, REMOTE_MANIFEST_NAME))
+        self.scan = scan
+        self.manifest_outside_root = scan or bool(manifest_path)
+
+    def __str__(self):
+        return self.root
+
+    def connect(self):
+        os.makedirs(self.root, exist_ok=True)
+        return None
+
+    def disconnect(self, connection):
+        pass
+
+    def read_manifest(self, connection):
+        if self.scan:
+            return {'version': REMOTE_MANIFEST_VERSION, 'files': build_local_manifest(self.root)}
+        if not os.path.exists(self.manifest_path):
+            return None
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def write_manifest(self, connection, data):
+        if self.scan:
+            return
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        self.put_bytes(self.manifest_path, data)
+
+    def upload(self, connection, local_path, remote_path):
+        dest = os.path.join(self.root, *remote_path.split('/'))
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        tmp = dest + '.tmp'
+        shutil.copyfile(local_path, tmp)
+        os.replace(tmp, dest)
+
+    def delete(self, connection, remote_path):
+        dest = os.path.join(self.root, *remote_path.split('/'))
+        if os.path.exists(dest):
+            os.remove(dest)
+        # Drop directories left empty by the removal
+        parent = os.path.dirname(dest)
+        while parent != self.root and os.path.isdir(parent) and not os.listdir(parent):
+            os.rmdir(parent)
+            parent = os.path.dirname(parent)
+
+    @staticmethod
+    def put_bytes(dest, data):
+        tmp = dest + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, dest)
+
+
+class FTPTarget:
+    """Deploy to an FTP server; each pooled connection is logged in once"""
+
+    def __init__(self, host, username, password, remote_path='/', port=21, timeout=30,
+                 manifest_path=None):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.root = '/' + remote_path.strip('/') if remote_path.strip('/') else ''
+        self.timeout = timeout
+        # Absolute path on the server, e.g. outside the web root
+        self.manifest_path = manifest_path or self.remote(REMOTE_MANIFEST_NAME)
+        self.manifest_outside_root = bool(manifest_path)
+        # Directories known to exist, shared by all connections
+        self.directories = {'', '/'}
+        self.directories_lock = threading.Lock()
+
+    def __str__(self):
+        return f"ftp://{self.host}:{self.port}{self.root or '/'}"
+
+    def connect(self):
+        connection = ftplib.FTP(timeout=self.timeout)
+        connection.connect(self.host, self.port)
+        connection.login(self.username, self.password)
+        return connection
+
+    def disconnect(self, connection):
+        try:
+            connection.quit()
+        except ftplib.all_errors:
+            connection.close()
+
+    def remote(self, path):
+        return f"{self.root}/{path}"
+
+    def ensure_directory(self, connection, directory):
+        """Create a remote directory and its parents, once per deployment"""
+        missing = []
+        while directory and directory not in self.directories:
+            missing.append(directory)
+            directory = posixpath.dirname(directory)
+        for path in reversed(missing):
+            try:
+                connection.mkd(path)
+            except ftplib.error_perm:
+                # Already exists (or created by another connection)
+                pass
+            with self.directories_lock:
+                self.directories.add(path)
+
+    def read_manifest(self, connection):
+        buffer = io.BytesIO()
+        try:
+            connection.retrbinary(f"RETR {self.manifest_path}", buffer.write)
+        except ftplib.error_perm:
+            return None
+        return json.loads(buffer.getvalue().decode('utf-8'))
+
+    def write_manifest(self, connection, data):
+        self.put(connection, io.BytesIO(data), self.manifest_path)
+
+    def upload(self, connection, local_path, remote_path):
+        with open(local_path, 'rb') as f:
+            self.put(connection, f, self.remote(remote_path))
+
+    def put(self, connection, f, path):
+        """Store a file under a temporary name, then rename it into place"""
+        self.ensure_directory(connection, posixpath.dirname(path))
+        connection.storbinary(f"STOR {path}.tmp", f)
+        try:
+            connection.rename(f"{path}.tmp", path)
+        except ftplib.error_perm:
+            # Some servers refuse to rename over an existing file
+            connection.delete(path)
+            connection.rename(f"{path}.tmp", path)
+
+    def delete(self, connection, remote_path):
+        try:
+            connection.delete(self.remote(remote_path))
+        except ftplib.error_perm:
+            # Already gone
+            pass
+
+
+def deploy(build_dir, target, workers=4, dry_run=False):
+    """Deploy the differences between build_dir and target
+
+    Returns a dict with the uploaded, deleted and unchanged file counts.
+    """
+    build_dir = str(build_dir)
+    local = build_local_manifest(build_dir)
+    pool = ConnectionPool(target, max(1, workers))
+
+    with pool.connection() as connection:
+        remote_manifest = target.read_manifest(connection)
+
+    remote = {}
+    if remote_manifest and remote_manifest.get('version') == REMOTE_MANIFEST_VERSION:
+        remote = remote_manifest.get('files', {})
+    else:
+        print("  ℹ️  No deployment manifest at the remote, uploading everything")
+
+    assets, pages, deletions = plan_deployment(local, remote)
+    stats = {
+        'uploaded': len(assets) + len(pages),
+        'deleted': len(deletions),
+        'unchanged': len(local) - len(assets) - len(pages),
+    }
+    print(f"  ℹ️  {stats['uploaded']} to upload, {stats['deleted']} to delete, "
+          f"{stats['unchanged']} unchanged")
+
+    if dry_run:
+        for path in assets + pages:
+            print(f"  ⬆️  {path}")
+        for path in deletions:
+            print(f"  🗑️  {path}")
+        pool.close()
+        return stats
+
+    def run(operation, paths, symbol):
+        def step(path):
+            try:
+                with pool.connection() as connection:
+                    operation(connection, path)
+            except ftplib.all_errors:
+                # Retry once on a fresh connection, e.g. after a server timeout
+                with pool.connection() as connection:
+                    operation(connection, path)
+            return path
+
+        with ThreadPoolExecutor(max_workers=pool.size) as executor:
+            for path in executor.map(step, paths):
+                print(f"  {symbol} {path}")
+
+    def upload(connection, path):
+        target.upload(connection, os.path.join(build_dir, *path.split('/')), path)
+
+    try:
+        # Assets first, pages once everything they reference is live
+        run(upload, assets, '✓')
+        run(upload, pages, '✓')
+        run(target.delete, deletions, '🗑️ ')
+
+        manifest = {'version': REMOTE_MANIFEST_VERSION, 'files': local}
+        data = json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8')
+        with pool.connection() as connection:
+            target.write_manifest(connection, data)
+            if target.manifest_outside_root:
+                # Drop a manifest published by earlier deployments
+                target.delete(connection, REMOTE_MANIFEST_NAME)
+    finally:
+        pool.close()
+
+    return stats
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Deployment Script for Website Projects
+
+This script helps deploy websites to various platforms:
+- GitHub Pages
+- Netlify
+- Vercel
+- FTP/SFTP servers
+"""
+
+import os
+import sys
+import ftplib
+import shutil
+import argparse
+import threading
+import subprocess
+from pathlib import Path
+from datetime import datetime
+
+class WebsiteDeployer:
+    """Website deployment automation"""
+
+    def __init__(self, project_path='.'):
+        self.project_path = Path(project_path).resolve()
+        self.build_dir = self.project_path / 'dist'
+
+    def build_site(self):
+        """Run an incremental build of dist/ (no deployment package)"""
+        print("\n📦 Building project...")
+        from build import WebsiteBuilder
+        return WebsiteBuilder(self.project_path, package=False).build()
+
+    def git(self, *args, cwd=None, check=True):
+        """Run a git command and return its stripped stdout"""
+        result = subprocess.run(['git', *args], cwd=cwd or self.project_path,
+                                capture_output=True, text=True)
+        if check and result.returncode != 0:
+            raise subprocess.CalledProcessError(result.returncode, ['git', *args],
+                                                result.stdout, result.stderr)
+        return result.stdout.strip() if result.returncode == 0 else None
+
+    def prepare_pages_checkout(self, checkout, remote, branch):
+        """Clone or update a persistent checkout of the pages branch
+
+        The checkout lives inside the project's git directory, so it is
+        never committed or picked up by the build.
+        """
+        if (checkout / '.git').exists():
+            self.git('remote', 'set-url', 'origin', remote, cwd=checkout)
+            if self.git('fetch', 'origin', branch, cwd=checkout, check=False) is not None:
+                self.git('reset', '--hard', 'FETCH_HEAD', cwd=checkout)
+            return
+
+        checkout.parent.mkdir(parents=True, exist_ok=True)
+        if self.git('clone', '--branch', branch, '--single-branch', remote, str(checkout),
+                    check=False) is None:
+            # First deployment: start an empty branch
+            shutil.rmtree(checkout, ignore_errors=True)
+            checkout.mkdir(parents=True)
+            self.git('init', '-q', cwd=checkout)
+            self.git('checkout', '-q', '--orphan', branch, cwd=checkout)
+            self.git('remote', 'add', 'origin', remote, cwd=checkout)
+
+    def deploy_to_github_pages(self, branch='gh-pages', workers=4, dry_run=False):
+        """Deploy to GitHub Pages
+
+        Keeps a checkout of the pages branch, applies only the files that
+        changed since the last deployment and pushes a regular commit on
+        top of the branch history. The checkout itself tells what is
+        deployed, so no manifest is published on the branch.
+        """
+        print("\n🚀 Deploying to GitHub Pages...")
+
+        from delta_deploy import DirectoryTarget, deploy
+
+        try:
+            git_dir = self.git('rev-parse', '--absolute-git-dir', check=False)
+            if git_dir is None:
+                print("  ✗ Not a git repository")
+                return False
+
+            remote = self.git('remote', 'get-url', 'origin', check=False)
+            if not remote:
+                print("  ✗ No 'origin' remote configured")
+                return False
+            if '://' not in remote and ':' not in remote.split('/')[0]:
+                # Local path remotes are relative to the project
+                remote = str((self.project_path / remote).resolve())
+
+            if not self.build_site():
+                return False
+
+            checkout = Path(git_dir) / 'deploy' / branch
+            self.prepare_pages_checkout(checkout, remote, branch)
+
+            print(f"\n📤 Deploying changed files to {branch} branch...")
+            stats = deploy(self.build_dir, DirectoryTarget(checkout, scan=True),
+                           workers=workers, dry_run=dry_run)
+            if dry_run:
+                return True
+
+            self.git('add', '-A', cwd=checkout)
+            if not self.git('status', '--porcelain', cwd=checkout):
+                print("✅ GitHub Pages already up to date")
+                return True
+
+            message = (f"Deploy {datetime.now():%Y-%m-%d %H:%M:%S}: "
+                       f"{stats['uploaded']} updated, {stats['deleted']} removed")
+            self.git('commit', '-q', '-m', message, cwd=checkout)
+            self.git('push', '-q', 'origin', f'HEAD:{branch}', cwd=checkout)
+
+            print("✅ Deployed to GitHub Pages!")
+            return True
+
+        except subprocess.CalledProcessError as e:
+            print(f"❌ Deployment failed: {e}")
+            if e.stderr:
+                print(f"  {e.stderr.strip()}")
+            return False
+
+    def deploy_to_netlify(self):
+        """Deploy to Netlify using Netlify CLI"""
+        print("\n🚀 Deploying to Netlify...")
+
+        try:
+            # Check if netlify CLI is installed
+            result = subprocess.run(['netlify', '--version'],
+                                  capture_output=True, text=True)
+
+            if result.returncode != 0:
+                print("  ℹ️  Netlify CLI not found")
+                print("  💡 Install it: npm install -g netlify-cli")
+                return False
+
+            # Deploy
+            subprocess.run(['netlify', 'deploy', '--prod', '--dir=dist'],
+                         cwd=self.project_path, check=True)
+
+            print("✅ Deployed to Netlify!")
+            return True
+
+        except subprocess.CalledProcessError as e:
+            print(f"❌ Deployment failed: {e}")
+            return False
+
+    def deploy_to_vercel(self):
+        """Deploy to Vercel using Vercel CLI"""
+        print("\n🚀 Deploying to Vercel...")
+
+        try:
+            # Check if vercel CLI is installed
+            result = subprocess.run(['vercel', '--version'],
+                                  capture_output=True, text=True)
+
+            if result.returncode != 0:
+                print("  ℹ️  Vercel CLI not found")
+                print("  💡 Install it: npm install -g vercel")
+                return False
+
+            # Deploy
+            subprocess.run(['vercel', '--prod'],
+                         cwd=self.project_path, check=True)
+
+            print("✅ Deployed to Vercel!")
+            return True
+
+        except subprocess.CalledProcessError as e:
+            print(f"❌ Deployment failed: {e}")
+            return False
+
+    def deploy_to_ftp(self, host, username, password, remote_path='/', port=21,
+                      workers=4, dry_run=False, manifest_path=None):
+        """Deploy changed files to an FTP server over pooled connections"""
+        print(f"\n🚀 Deploying to FTP: {host}...")
+
+        from delta_deploy import FTPTarget, deploy
+
+        try:
+            if not self.build_site():
+                return False
+
+            target = FTPTarget(host, username, password, remote_path, port=port,
+                               manifest_path=manifest_path)
+            print(f"\n📤 Uploading changed files to {target}...")
+            deploy(self.build_dir, target, workers=workers, dry_run=dry_run)
+
+            print("✅ Deployed to FTP!")
+            return True
+
+        except (OSError, EOFError, ftplib.Error) as e:
+            print(f"❌ Deployment failed: {e}")
+            return False
+
+    def deploy_to_directory(self, target_path, workers=4, dry_run=False, manifest_path=None):
+        """Deploy changed files to a local or mounted directory"""
+        print(f"\n🚀 Deploying to directory: {target_path}...")
+
+        from delta_deploy import DirectoryTarget, deploy
+
+        try:
+            if not self.build_site():
+                return False
+
+            deploy(self.build_dir, DirectoryTarget(target_path, manifest_path),
+                   workers=workers, dry_run=dry_run)
+
+            print("✅ Deployed to directory!")
+            return True
+
+        except OSError as e:
+            print(f"❌ Deployment failed: {e}")
+            return False
+
+    def preview_deployment(self, port=8000, watch=False):
+        """Preview deployment before publishing
+
+        Serves dist/ with production-like caching, compression and range
+        support. With watch=True, changed sources are rebuilt
+        incrementally and connected browsers reload.
+        """
+        print("\n👁️  Previewing deployment...")
+
+        from preview_server import (LiveReload, PreviewRequestHandler,
+                                    ThreadPoolHTTPServer, watch_sources)
+
+        livereload = LiveReload() if watch else None
+        stop = threading.Event()
+
+        try:
+            if watch:
+                from build import WebsiteBuilder
+
+                def make_builder():
+                    return WebsiteBuilder(self.project_path, package=False)
+
+                if not make_builder().build():
+                    return
+                watcher = threading.Thread(target=watch_sources,
+                                           args=(make_builder, livereload),
+                                           kwargs={'stop': stop}, daemon=True)
+                watcher.start()
+            elif not self.build_dir.exists():
+                print("  ✗ No build found, run: python scripts/build.py")
+                return
+
+            with ThreadPoolHTTPServer(("", port), PreviewRequestHandler, self.build_dir,
+                                      livereload=livereload) as httpd:
+                print(f"✅ Server started at http://localhost:{port}")
+                if watch:
+                    print("👀 Watching for changes")
+                print("Press Ctrl+C to stop")
+                httpd.serve_forever()
+
+        except KeyboardInterrupt:
+            print("\n🛑 Server stopped")
+        except Exception as e:
+            print(f"❌ Preview failed: {e}")
+        finally:
+            stop.set()
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description='Deploy a built website',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""Platforms:
+  github   - Deploy to GitHub Pages
+  netlify  - Deploy to Netlify
+  vercel   - Deploy to Vercel
+  ftp      - Upload changed files to an FTP server
+  dir      - Copy changed files to a directory
+  preview  - Preview deployment locally
+
+github, ftp and dir only transfer files whose content changed since the
+last deployment. ftp and dir track them in .deploy-manifest.json at the
+remote; use --manifest-path to keep it outside the web root.
+
+Examples:
+  python scripts/deploy.py github
+  python scripts/deploy.py netlify
+  FTP_PASSWORD=secret python scripts/deploy.py ftp --host ftp.example.com --user me
+  python scripts/deploy.py dir --target /var/www/site
+  python scripts/deploy.py preview --watch""")
+    parser.add_argument('platform', help='github, netlify, vercel, ftp, dir or preview')
+    parser.add_argument('project_path', nargs='?', default='.',
+                        help='project directory (default: current directory)')
+    parser.add_argument('--port', type=int, default=8000,
+                        help='preview server port (default: 8000)')
+    parser.add_argument('--watch', action='store_true',
+                        help='preview: rebuild changed files and reload browsers')
+    parser.add_argument('--branch', default='gh-pages',
+                        help='github: branch to publish to (default: gh-pages)')
+    parser.add_argument('--host', help='ftp: server host name')
+    parser.add_argument('--ftp-port', type=int, default=21,
+                        help='ftp: server port (default: 21)')
+    parser.add_argument('--user', default='anonymous', help='ftp: user name')
+    parser.add_argument('--password', default=os.environ.get('FTP_PASSWORD', ''),
+                        help='ftp: password (default: $FTP_PASSWORD)')
+    parser.add_argument('--remote-path', default='/',
+                        help='ftp: directory on the server (default: /)')
+    parser.add_argument('--target', help='dir: directory to deploy into')
+    parser.add_argument('--manifest-path',
+                        help='ftp/dir: where to keep the deployment manifest '
+                             '(default: .deploy-manifest.json in the remote root)')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='parallel uploads / pooled connections (default: 4)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='show what would be uploaded and deleted')
+    args = parser.parse_args()
+
+    platform = args.platform.lower()
+    deployer = WebsiteDeployer(args.project_path)
+
+    if platform == 'github':
+        ok = deployer.deploy_to_github_pages(branch=args.branch, workers=args.workers,
+                                             dry_run=args.dry_run)
+    elif platform == 'netlify':
+        ok = deployer.deploy_to_netlify()
+    elif platform == 'vercel':
+        ok = deployer.deploy_to_vercel()
+    elif platform == 'ftp':
+        if not args.host:
+            parser.error('ftp requires --host')
+        ok = deployer.deploy_to_ftp(args.host, args.user, args.password,
+                                    remote_path=args.remote_path, port=args.ftp_port,
+                                    workers=args.workers, dry_run=args.dry_run,
+                                    manifest_path=args.manifest_path)
+    elif platform in ('dir', 'directory'):
+        if not args.target:
+            parser.error('dir requires --target')
+        ok = deployer.deploy_to_directory(args.target, workers=args.workers,
+                                          dry_run=args.dry_run, manifest_path=args.manifest_path)
+    elif platform == 'preview':
+        deployer.preview_deployment(port=args.port, watch=args.watch)
+        ok = True
+    else:
+        print(f"❌ Unknown platform: {platform}")
+        ok = False
+
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Asset Fingerprinting Helpers
+
+Content-hashed file names for long-lived immutable caching, used by
+build.py:
+- main.css -> main.3f9a1c2b.css
+- Rewrites references in HTML attributes (src, href, srcset, poster, ...)
+  and in og:image/twitter:image meta tags
+- Rewrites CSS url() and @import values, including inline styles in HTML
+
+Only references that resolve to a fingerprinted file in the build are
+rewritten; external URLs, data: URIs and unknown paths are left alone.
+"""
+
+import re
+import posixpath
+
+# Hex digits of the content hash kept in file names
+HASH_LENGTH = 8
+
+# Static assets that receive content-hashed names
+FINGERPRINT_EXTENSIONS = {
+    '.css', '.js',
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif', '.svg',
+    '.woff', '.woff2', '.ttf', '.otf', '.eot',
+}
+
+# Files that must keep a stable URL
+FINGERPRINT_EXCLUDE = {'sw.js', 'service-worker.js'}
+
+_SCHEME = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.-]*:')
+_HTML_ATTRIBUTE = re.compile(
+    r'''(\s(?:src|href|poster|data-src|data-bg|data-background)\s*=\s*)(["'])(.*?)\2''',
+    re.IGNORECASE | re.DOTALL)
+_HTML_META = re.compile(r'<meta\b[^>]*>', re.IGNORECASE)
+_META_IMAGE = re.compile(
+    r'''\s(?:property|name)\s*=\s*(["']?)(?:og:image(?::url|:secure_url)?|twitter:image(?::src)?)\1[\s/>]''',
+    re.IGNORECASE)
+_META_CONTENT = re.compile(r'''(\scontent\s*=\s*)(["'])(.*?)\2''', re.IGNORECASE | re.DOTALL)
+_HTML_SRCSET = re.compile(
+    r'''(\s(?:srcset|data-srcset)\s*=\s*)(["'])(.*?)\2''', re.IGNORECASE | re.DOTALL)
+_CSS_URL = re.compile(r'''(url\(\s*)(["']?)([^"')]*)\2(\s*\))''', re.IGNORECASE)
+_CSS_IMPORT = re.compile(r'''(@import\s+)(["'])([^"']*)\2''', re.IGNORECASE)
+
+
+def should_fingerprint(key):
+    """Check whether a build path gets a content-hashed name"""
+    name = posixpath.basename(key)
+    return (posixpath.splitext(name)[1].lower() in FINGERPRINT_EXTENSIONS
+            and name not in FINGERPRINT_EXCLUDE)
+
+
+def fingerprint_name(key, digest):
+    """Insert a content hash before the extension: a/main.css -> a/main.<hash>.css"""
+    stem, ext = posixpath.splitext(key)
+    return f"{stem}.{digest[:HASH_LENGTH]}{ext}"
+
+
+def resolve_reference(url, base_key):
+    """Resolve a URL found in base_key to a build path
+
+    Returns (build path, suffix) where suffix is the query string and
+    fragment, or (None, None) for external and non-file URLs.
+    """
+    url = url.strip()
+    if not url or url.startswith(('#', '//')) or _SCHEME.match(url):
+        return None, None
+
+    cut = len(url)
+    for marker in '?#':
+        index = url.find(marker)
+        if index != -1:
+            cut = min(cut, index)
+    path, suffix = url[:cut], url[cut:]
+    if not path:
+        return None, None
+
+    if path.startswith('/'):
+        resolved = posixpath.normpath(path.lstrip('/'))
+    else:
+        resolved = posixpath.normpath(posixpath.join(posixpath.dirname(base_key), path))
+    if resolved.startswith('..'):
+        return None, None
+    return resolved, suffix
+
+
+def rewrite_url(url, base_key, asset_map, references=None):
+    """Return url pointing at the fingerprinted file, or url unchanged
+
+    Every local path the URL resolves to is added to references, so
+    callers can rebuild the document when one of them changes.
+    """
+    resolved, suffix = resolve_reference(url, base_key)
+    if resolved is None:
+        return url
+    if references is not None:
+        references.add(resolved)
+    hashed = asset_map.get(resolved)
+    if hashed is None:
+        return url
+
+    stripped = url.strip()
+    path = stripped[:len(stripped) - len(suffix)]
+    # Hashed files live next to the original, so only the name changes
+    return path[:len(path) - len(posixpath.basename(path))] + posixpath.basename(hashed) + suffix
+
+
+def rewrite_css(content, css_key, asset_map, references=None):
+    """Rewrite url() and @import references in a stylesheet"""
+    def replace_url(match):
+        prefix, quote, url, suffix = match.groups()
+        if url.lstrip().startswith('data:'):
+            return match.group()
+        return prefix + quote + rewrite_url(url, css_key, asset_map, references) + quote + suffix
+
+    def replace_import(match):
+        prefix, quote, url = match.groups()
+        return prefix + quote + rewrite_url(url, css_key, asset_map, references) + quote
+
+    content = _CSS_URL.sub(replace_url, content)
+    return _CSS_IMPORT.sub(replace_import, content)
+
+
+def rebase_css(content, css_key, page_key):
+    """Make url() references in CSS from css_key valid inside page_key
+
+    Used when stylesheet rules are inlined into a page in another
+    directory.
+    """
+    base = posixpath.dirname(page_key) or '.'
+
+    def replace_url(match):
+        prefix, quote, url, suffix = match.groups()
+        resolved, query = resolve_reference(url, css_key)
+        if resolved is None or url.strip().startswith('/'):
+            return match.group()
+        return prefix + quote + posixpath.relpath(resolved, base) + query + quote + suffix
+
+    return _CSS_URL.sub(replace_url, content)
+
+
+def rewrite_html(content, page_key, asset_map, references=None):
+    """Rewrite asset references in an HTML page"""
+    def replace_attribute(match):
+        prefix, quote, url = match.groups()
+        return prefix + quote + rewrite_url(url, page_key, asset_map, references) + quote
+
+    def replace_srcset(match):
+        prefix, quote, value = match.groups()
+        candidates = []
+        for candidate in value.split(','):
+            parts = candidate.strip().split(None, 1)
+            if parts:
+                parts[0] = rewrite_url(parts[0], page_key, asset_map, references)
+            candidates.append(' '.join(parts))
+        return prefix + quote + ', '.join(candidates) + quote
+
+    def replace_meta(match):
+        tag = match.group()
+        if not _META_IMAGE.search(tag):
+            return tag
+        return _META_CONTENT.sub(replace_attribute, tag)
+
+    content = _HTML_ATTRIBUTE.sub(replace_attribute, content)
+    content = _HTML_SRCSET.sub(replace_srcset, content)
+    content = _HTML_META.sub(replace_meta, content)
+    # Inline styles and <style> blocks
+    return rewrite_css(content, page_key, asset_map, references)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Image Optimization Helpers
+
+Responsive image variants and <img> rewriting, used by build.py:
+- Re-encodes JPEG/PNG/WebP with quality limits, capped at the largest width
+- Writes narrower variants (photo.jpg-320w.jpg, photo.jpg-640w.jpg, ...)
+- Writes a WebP copy of every width (photo.jpg-320w.webp, ...)
+- Rewrites <img> tags into <picture> with srcset/sizes and width/height
+
+Encoded files are cached by content hash outside dist/, so an image is
+only ever re-encoded when its bytes or the settings change.
+
+Requires Pillow (pip install Pillow); without it images are copied as-is.
+"""
+
+import io
+import os
+import re
+import json
+import shutil
+import hashlib
+import tempfile
+import posixpath
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+from fingerprint import resolve_reference
+
+# Raster formats that are re-encoded
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
+
+# Encoder settings; bump the version to invalidate cached variants
+IMAGE_SETTINGS = {
+    'encoder': 'pillow-2',
+    'widths': [320, 640, 960, 1280, 1920],
+    'jpeg_quality': 80,
+    'webp_quality': 75,
+}
+
+# Default <img sizes>: full width on phones, Bootstrap's two and three
+# column grids on tablets and desktops
+DEFAULT_SIZES = '(max-width: 767px) 100vw, (max-width: 991px) 50vw, 33vw'
+
+MIME_TYPES = {'.jpg': 'image/jpeg', '.jpeg': 'image/jpeg', '.png': 'image/png',
+              '.webp': 'image/webp'}
+
+_IMG_TAG = re.compile(r'''<img\b(?:[^>"']|"[^"]*"|'[^']*')*>''', re.IGNORECASE)
+_TAG_NAME = re.compile(r'<[^\s/>]+')
+_ATTRIBUTE = re.compile(r'''([^\s=/>]+)(?:\s*=\s*("[^"]*"|'[^']*'|[^\s>]+))?''')
+
+
+def variant_key(key, suffix):
+    """Build path of a variant: (a/photo.jpg, -640w.webp) -> a/photo.jpg-640w.webp
+
+    The source extension stays in the name, so photo.jpg and photo.png
+    in one directory never share variants.
+    """
+    return key + suffix
+
+
+def encode(image, ext, settings):
+    """Encode a Pillow image in the format given by a file extension"""
+    buffer = io.BytesIO()
+    if ext in ('.jpg', '.jpeg'):
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        image.save(buffer, 'JPEG', quality=settings['jpeg_quality'], optimize=True,
+                   progressive=True)
+    elif ext == '.png':
+        image.save(buffer, 'PNG', optimize=True)
+    else:
+        image.save(buffer, 'WEBP', quality=settings['webp_quality'], method=6)
+    return buffer.getvalue()
+
+
+def encode_variants(data, ext, settings):
+    """Re-encode an image and produce its width and WebP variants
+
+    Returns (width, height, files) where files is a list of
+    (suffix, width, height, bytes); the first entry is the main image
+    with suffix '' and keeps the original format. The original bytes are
+    kept when re-encoding does not make the main image smaller.
+    Animated images (animated WebP, APNG) are copied unchanged without
+    variants, since Pillow would only re-encode their first frame.
+    """
+    with Image.open(io.BytesIO(data)) as source:
+        if getattr(source, 'is_animated', False):
+            width, height = source.size
+            return width, height, [('', width, height, data)]
+        image = ImageOps.exif_transpose(source)
+        image.load()
+
+    if image.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+        image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+
+    width, height = image.size
+    largest = settings['widths'][-1]
+    if width > largest:
+        height = max(1, round(height * largest / width))
+        width = largest
+        image = image.resize((width, height), Image.LANCZOS)
+        main = encode(image, ext, settings)
+    else:
+        main = encode(image, ext, settings)
+        if len(main) >= len(data):
+            main = data
+
+    files = [('', width, height, main)]
+    for target in [w for w in settings['widths'] if w < width] + [width]:
+        if target == width:
+            resized, target_height = image, height
+        else:
+            target_height = max(1, round(height * target / width))
+            resized = image.resize((target, target_height), Image.LANCZOS)
+            files.append((f"-{target}w{ext}", target, target_height,
+                          encode(resized, ext, settings)))
+        if ext != '.webp':
+            files.append((f"-{target}w.webp", target, target_height,
+                          encode(resized, '.webp', settings)))
+    return width, height, files
+
+
+def cached_variants(data, ext, settings, cache_dir):
+    """Return the variants of an image, encoding them only on a cache miss
+
+    The cache entry is a directory named after the hash of the image and
+    the settings, holding the encoded files and a meta.json index.
+    Returns (meta, entry directory, True if it was a cache hit).
+    """
+    digest = hashlib.sha256(data)
+    digest.update(json.dumps([ext, settings], sort_keys=True).encode('utf-8'))
+    digest = digest.hexdigest()
+    entry = os.path.join(cache_dir, digest[:2], digest)
+    meta_path = os.path.join(entry, 'meta.json')
+
+    if os.path.exists(meta_path):
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f), entry, True
+
+    width, height, files = encode_variants(data, ext, settings)
+    os.makedirs(os.path.dirname(entry), exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=os.path.dirname(entry))
+    meta = {'width': width, 'height': height, 'files': []}
+    for index, (suffix, file_width, file_height, content) in enumerate(files):
+        name = f"{index}{suffix or ext}"
+        with open(os.path.join(tmp, name), 'wb') as f:
+            f.write(content)
+        meta['files'].append({
+            'name': name,
+            'suffix': suffix,
+            'width': file_width,
+            'height': file_height,
+            'hash': hashlib.sha256(content).hexdigest(),
+            'size': len(content),
+        })
+    with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+
+    try:
+        os.rename(tmp, entry)
+    except OSError:
+        # Another worker cached the same image first
+        shutil.rmtree(tmp, ignore_errors=True)
+    return meta, entry, False
+
+
+def parse_attributes(tag):
+    """Return {lowercase name: value} for the attributes of a start tag"""
+    attributes = {}
+    for match in _ATTRIBUTE.finditer(tag[_TAG_NAME.match(tag).end():-1]):
+        name, value = match.groups()
+        if value and value[0] in '"\'':
+            value = value[1:-1]
+        attributes[name.lower()] = value if value is not None else ''
+    return attributes
+
+
+def rewrite_images(content, page_key, images, references=None, sizes=DEFAULT_SIZES):
+    """Turn <img> tags that show optimized images into responsive markup
+
+    images maps build paths to their metadata (width, height, type and
+    variants). Tags that already have a srcset, sit inside a <picture>
+    or show an image without variants are left alone apart from
+    missing width/height.
+    Referenced image paths are added to references.
+    """
+    lowered = content.lower()
+
+    def replace(match):
+        tag = match.group()
+        attributes = parse_attributes(tag)
+        src = attributes.get('src', '')
+        resolved, suffix = resolve_reference(src, page_key)
+        image = images.get(resolved)
+        if image is None or suffix:
+            return tag
+        if references is not None:
+            references.add(resolved)
+
+        added = []
+        if 'width' not in attributes and 'height' not in attributes:
+            added.append(f'width="{image["width"]}" height="{image["height"]}"')
+
+        start = match.start()
+        in_picture = lowered.rfind('<picture', 0, start) > lowered.rfind('</picture', 0, start)
+        if 'srcset' in attributes or in_picture or not image['variants']:
+            return insert_attributes(tag, added)
+
+        # Variants live next to the original, so only the name changes
+        src = src.strip()
+        base = src[:len(src) - len(posixpath.basename(src))]
+        main = {'key': resolved, 'width': image['width'], 'type': image['type']}
+        candidates = {}
+        for variant in [main] + image['variants']:
+            candidates.setdefault(variant['type'], []).append(
+                (variant['width'], base + posixpath.basename(variant['key'])))
+
+        def srcset(mime):
+            return ', '.join(f"{url} {width}w" for width, url in sorted(candidates[mime]))
+
+        image_sizes = attributes.get('sizes') or sizes
+        if 'sizes' not in attributes:
+            added.append(f'sizes="{image_sizes}"')
+        added.insert(0, f'srcset="{srcset(image["type"])}"')
+        tag = insert_attributes(tag, added)
+        if image['type'] == 'image/webp' or 'image/webp' not in candidates:
+            return tag
+        return (f'<picture><source type="image/webp" srcset="{srcset("image/webp")}" '
+                f'sizes="{image_sizes}">{tag}</picture>')
+
+    return _IMG_TAG.sub(replace, content)
+
+
+def insert_attributes(tag, attributes):
+    """Append attributes before the end of a start tag"""
+    if not attributes:
+        return tag
+    if tag.endswith('/>'):
+        return f"{tag[:-2].rstrip()} {' '.join(attributes)} />"
+    return f"{tag[:-1].rstrip()} {' '.join(attributes)}>"
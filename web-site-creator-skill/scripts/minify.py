@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Streaming CSS and JavaScript Minifier
+
+Tokenizing minifiers used by build.py:
+- Understand strings, comments, regex literals and template literals
+- Work on chunked input, so memory stays bounded on large vendor files
+- Only remove comments and whitespace, never rewrite code
+
+Whitespace is dropped only where removing it cannot change how the code
+is parsed. Line breaks that JavaScript's automatic semicolon insertion
+may depend on are kept. License comments (/*! ... */) are preserved.
+
+Usage:
+    minifier = JSMinifier()
+    for chunk in chunks:
+        out.write(minifier.feed(chunk))
+    out.write(minifier.finish())
+"""
+
+import re
+import sys
+
+# Read size used by minify_stream()
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r'[\s\ufeff]+')
+_NEWLINE = re.compile(r'[\n\r\u2028\u2029]')
+_BLOCK_COMMENT = re.compile(r'/\*[\s\S]*?\*/')
+_LINE_COMMENT = re.compile(r'//[^\n\r\u2028\u2029]*')
+_STRING = re.compile(r'''"(?:[^"\\\n\r]|\\(?:\r\n|[\s\S]))*"|'(?:[^'\\\n\r]|\\(?:\r\n|[\s\S]))*\'''')
+
+# JavaScript tokens
+_JS_WORD = re.compile(r'[\w$\\\u0080-\uffff]+')
+_JS_REGEX = re.compile(r'/(?![*/])(?:[^/\\\[\n\r]|\\.|\[(?:[^\]\\\n\r]|\\.)*\])+/[A-Za-z]*')
+_JS_TEMPLATE = re.compile(r'[`}](?:[^`\\$]|\\[\s\S]|\$(?!\{))*(?:`|\$\{)')
+
+# Keywords after which a slash starts a regex literal, not a division
+_JS_REGEX_KEYWORDS = {
+    'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void',
+    'throw', 'case', 'do', 'else', 'yield', 'await',
+}
+
+# Statement heads: a slash after the ")" closing their parenthesis starts a regex
+_JS_HEAD_KEYWORDS = {'if', 'while', 'for', 'with'}
+
+# A line break after / before these characters can never end a statement
+_JS_NEWLINE_SAFE_AFTER = set('{([,;:=&|?!<>*%^~')
+_JS_NEWLINE_SAFE_BEFORE = set(')]},;:?=&|*%^<>')
+
+# CSS tokens
+_CSS_WORD = re.compile(r'[^\s"\'/{}();:,>~!]+')
+_CSS_URL = re.compile(r'url\(\s*(?![\s"\'])[^)]*\)', re.IGNORECASE)
+
+# Whitespace next to these CSS characters carries no meaning
+_CSS_SPACE_FREE_AFTER = set('{};,>~(:')
+_CSS_SPACE_FREE_BEFORE = set('{};,>~)!')
+
+
+def _is_word_char(char):
+    """Check whether a character can be part of an identifier or number"""
+    return char.isalnum() or char in '_$\\' or char > '\x7f'
+
+
+class _StreamingMinifier:
+    """Chunk buffering shared by the tokenizing minifiers
+
+    Subclasses implement _scan(), which consumes complete tokens from
+    self.buffer and returns the position of the first unconsumed
+    character. A token that may continue in the next chunk is left in
+    the buffer, so only the tail of the current chunk is ever retained.
+    """
+
+    def __init__(self):
+        self.buffer = ''
+        self.output = []
+        self.last_char = ''
+        self.pending_space = False
+        self.pending_newline = False
+
+    def feed(self, chunk):
+        """Consume a chunk of source text and return minified output"""
+        self.buffer += chunk
+        self.buffer = self.buffer[self._scan(final=False):]
+        return self._drain()
+
+    def finish(self):
+        """Flush the remaining input and return the final output"""
+        self._scan(final=True)
+        self.buffer = ''
+        return self._drain()
+
+    def _drain(self):
+        output = ''.join(self.output)
+        self.output = []
+        return output
+
+    def _scan(self, final):
+        raise NotImplementedError
+
+
+class JSMinifier(_StreamingMinifier):
+    """Remove comments and redundant whitespace from JavaScript"""
+
+    def __init__(self):
+        super().__init__()
+        # One entry per open brace: True when it opened a template ${...}
+        self.braces = []
+        # One entry per open parenthesis: True when it opened a statement head
+        self.parens = []
+        self.last_token = ''
+        self.token_before = ''
+        self.regex_allowed = True
+
+    def _emit(self, token, regex_allowed):
+        first = token[0]
+        prev = self.last_char
+        if prev and self.pending_newline and not (
+                prev in _JS_NEWLINE_SAFE_AFTER or first in _JS_NEWLINE_SAFE_BEFORE):
+            self.output.append('\n')
+        elif prev and (self.pending_space or self.pending_newline) and self._needs_space(prev, first):
+            self.output.append(' ')
+        self.pending_space = self.pending_newline = False
+
+        self.output.append(token)
+        self.last_char = token[-1]
+        self.token_before = self.last_token
+        self.last_token = token
+        self.regex_allowed = regex_allowed
+
+    @staticmethod
+    def _needs_space(prev, first):
+        if _is_word_char(prev) and _is_word_char(first):
+            return True
+        # Avoid forming ++, --, //, /*, <!-- and --> out of separate tokens
+        if prev == first and prev in '+-/':
+            return True
+        if (prev, first) in (('/', '*'), ('<', '!'), ('-', '>')):
+            return True
+        # "1 .toString()" must not become a decimal point
+        return prev.isdigit() and first == '.'
+
+    def _scan(self, final):
+        buffer = self.buffer
+        length = len(buffer)
+        pos = 0
+
+        while pos < length:
+            char = buffer[pos]
+
+            if char.isspace() or char == '\ufeff':
+                match = _WHITESPACE.match(buffer, pos)
+                # The token may continue in the next chunk
+                if not final and match.end() == length:
+                    break
+                if _NEWLINE.search(match.group()):
+                    self.pending_newline = True
+                else:
+                    self.pending_space = True
+                pos = match.end()
+
+            elif char == '/':
+                if pos + 1 >= length and not final:
+                    break
+                following = buffer[pos + 1:pos + 2]
+                if following == '/':
+                    match = _LINE_COMMENT.match(buffer, pos)
+                    if not final and match.end() == length:
+                        break
+                    self.pending_newline = True
+                    pos = match.end()
+                elif following == '*':
+                    match = _BLOCK_COMMENT.match(buffer, pos)
+                    if match is None:
+                        if not final:
+                            break
+                        # Unterminated comment: drop the rest of the input
+                        pos = length
+                        continue
+                    comment = match.group()
+                    if comment.startswith('/*!'):
+                        self._emit(comment, self.regex_allowed)
+                    elif _NEWLINE.search(comment):
+                        self.pending_newline = True
+                    else:
+                        self.pending_space = True
+                    pos = match.end()
+                elif self.regex_allowed:
+                    match = _JS_REGEX.match(buffer, pos)
+                    if match is None and not final and not _NEWLINE.search(buffer, pos):
+                        break
+                    if match is not None and not final and match.end() == length:
+                        break
+                    token = match.group() if match else char
+                    self._emit(token, match is None)
+                    pos += len(token)
+                else:
+                    self._emit(char, True)
+                    pos += 1
+
+            elif char in '"\'':
+                match = _STRING.match(buffer, pos)
+                if match is None and not final and not _NEWLINE.search(buffer, pos):
+                    break
+                token = match.group() if match else char
+                self._emit(token, False)
+                pos += len(token)
+
+            elif char == '`' or (char == '}' and self.braces and self.braces[-1]):
+                match = _JS_TEMPLATE.match(buffer, pos)
+                if match is None:
+                    if not final:
+                        break
+                    # Unterminated template: keep the rest verbatim
+                    self._emit(buffer[pos:], False)
+                    pos = length
+                    continue
+                token = match.group()
+                if char == '}':
+                    self.braces.pop()
+                if token.endswith('${'):
+                    self.braces.append(True)
+                    self._emit(token, True)
+                else:
+                    self._emit(token, False)
+                pos = match.end()
+
+            elif _is_word_char(char):
+                match = _JS_WORD.match(buffer, pos)
+                if not final and match.end() == length:
+                    break
+                token = match.group()
+                self._emit(token, token in _JS_REGEX_KEYWORDS)
+                pos = match.end()
+
+            else:
+                if char == '{':
+                    self.braces.append(False)
+                elif char == '}' and self.braces:
+                    self.braces.pop()
+                elif char == '(':
+                    self.parens.append(self.last_token in _JS_HEAD_KEYWORDS
+                                       and self.token_before != '.')
+                # A slash after ++/-- or a closing bracket is a division,
+                # unless the bracket closes an if/while/for/with head
+                head = char == ')' and bool(self.parens) and self.parens.pop()
+                postfix = char in '+-' and self.last_token == char and not (
+                    self.pending_space or self.pending_newline)
+                self._emit(char, head or (char not in ')]' and not postfix))
+                pos += 1
+
+        return pos
+
+
+class CSSMinifier(_StreamingMinifier):
+    """Remove comments and redundant whitespace from CSS"""
+
+    def __init__(self):
+        super().__init__()
+        self.pending_comment = False
+        self.pending_semicolon = False
+
+    def _emit(self, token):
+        first = token[0]
+        prev = self.last_char
+
+        # Drop the semicolon before a closing brace
+        if self.pending_semicolon:
+            if first != '}':
+                self.output.append(';')
+                prev = ';'
+            self.pending_semicolon = False
+
+        if prev and (self.pending_space or self.pending_newline):
+            if prev not in _CSS_SPACE_FREE_AFTER and first not in _CSS_SPACE_FREE_BEFORE:
+                self.output.append(' ')
+        elif self.pending_comment and _is_word_char(prev) and _is_word_char(first):
+            # A comment separated two tokens; keep them apart
+            self.output.append('/**/')
+        self.pending_space = self.pending_newline = self.pending_comment = False
+
+        if token == ';':
+            self.pending_semicolon = True
+            self.last_char = ';'
+            return
+        self.output.append(token)
+        self.last_char = token[-1]
+
+    def finish(self):
+        output = super().finish()
+        if self.pending_semicolon:
+            self.pending_semicolon = False
+            output += ';'
+        return output
+
+    def _scan(self, final):
+        buffer = self.buffer
+        length = len(buffer)
+        pos = 0
+
+        while pos < length:
+            char = buffer[pos]
+
+            if char.isspace():
+                match = _WHITESPACE.match(buffer, pos)
+                if not final and match.end() == length:
+                    break
+                self.pending_space = True
+                pos = match.end()
+
+            elif char == '/':
+                if pos + 1 >= length and not final:
+                    break
+                if buffer[pos + 1:pos + 2] != '*':
+                    self._emit(char)
+                    pos += 1
+                    continue
+                match = _BLOCK_COMMENT.match(buffer, pos)
+                if match is None:
+                    if not final:
+                        break
+                    pos = length
+                    continue
+                if match.group().startswith('/*!'):
+                    self._emit(match.group())
+                else:
+                    self.pending_comment = True
+                pos = match.end()
+
+            elif char in '"\'':
+                match = _STRING.match(buffer, pos)
+                if match is None and not final and not _NEWLINE.search(buffer, pos):
+                    break
+                token = match.group() if match else char
+                self._emit(token)
+                pos += len(token)
+
+            elif char in 'uU' and buffer[pos:pos + 4].lower() == 'url(':
+                match = _CSS_URL.match(buffer, pos)
+                if match is None:
+                    argument = _WHITESPACE.match(buffer, pos + 4)
+                    argument = argument.end() if argument else pos + 4
+                    if argument == length and not final:
+                        break
+                    if buffer[argument:argument + 1] in ('"', "'"):
+                        # Quoted URLs are minified as a string token
+                        self._emit(buffer[pos:pos + 4])
+                        pos = argument
+                        continue
+                    if not final:
+                        break
+                    self._emit(buffer[pos:])
+                    pos = length
+                    continue
+                self._emit(match.group())
+                pos = match.end()
+
+            elif char in '{}();:,>~!':
+                self._emit(char)
+                pos += 1
+
+            else:
+                match = _CSS_WORD.match(buffer, pos)
+                if not final and match.end() == length:
+                    break
+                self._emit(match.group())
+                pos = match.end()
+
+        return pos
+
+
+MINIFIERS = {
+    '.css': CSSMinifier,
+    '.js': JSMinifier,
+}
+
+
+def minify_stream(source, dest, minifier, chunk_size=CHUNK_SIZE):
+    """Minify from one text file object to another in bounded memory
+
+    Returns the number of characters written.
+    """
+    written = 0
+    for chunk in iter(lambda: source.read(chunk_size), ''):
+        output = minifier.feed(chunk)
+        dest.write(output)
+        written += len(output)
+    output = minifier.finish()
+    dest.write(output)
+    return written + len(output)
+
+
+def minify_text(content, minifier, chunk_size=CHUNK_SIZE):
+    """Minify a complete string, feeding it to the minifier in chunks"""
+    parts = [minifier.feed(content[start:start + chunk_size])
+             for start in range(0, len(content), chunk_size)]
+    parts.append(minifier.finish())
+    return ''.join(parts)
+
+
+def minify_css(content):
+    """Minify CSS source text"""
+    return minify_text(content, CSSMinifier())
+
+
+def minify_js(content):
+    """Minify JavaScript source text"""
+    return minify_text(content, JSMinifier())
+
+
+def main():
+    """Minify a file to stdout: minify.py <file.css|file.js>"""
+    if len(sys.argv) != 2 or not sys.argv[1].endswith(tuple(MINIFIERS)):
+        print("Usage: minify.py <file.css|file.js>")
+        sys.exit(1)
+
+    path = sys.argv[1]
+    minifier = MINIFIERS[path[path.rindex('.'):]]()
+    with open(path, 'r', encoding='utf-8') as f:
+        minify_stream(f, sys.stdout, minifier)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Preview Server for Built Websites
+
+A local server that behaves like the production setup, used by
+deploy.py preview:
+- Thread pool with HTTP/1.1 keep-alive
+- ETag / If-None-Match and Last-Modified / If-Modified-Since (304)
+- Single byte-range requests (206)
+- Serves prebuilt .br/.gz sidecars based on Accept-Encoding
+- Size-bounded in-memory LRU cache of hot files
+- Optional live reload: connected browsers reload after a rebuild
+"""
+
+import os
+import re
+import sys
+import time
+import socket
+import threading
+import mimetypes
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate, parsedate_to_datetime
+from http import HTTPStatus
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from urllib.parse import unquote, urlsplit, urlunsplit
+
+# Endpoint browsers subscribe to for reload events
+LIVERELOAD_PATH = '/__livereload'
+
+LIVERELOAD_SCRIPT = (
+    '<script>(function(){var s=new EventSource("' + LIVERELOAD_PATH + '");'
+    's.onmessage=function(){location.reload()};})();</script>'
+).encode('utf-8')
+
+# Precompressed sidecars in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+# Dot-paths (.git, .env, build manifests) are never served, except these
+PUBLIC_DOT_DIRS = {'.well-known'}
+
+# Same rule as the sample nginx.conf: content-hashed names never change
+_FINGERPRINTED = re.compile(r'\.[0-9a-f]{8}\.[A-Za-z0-9]+$')
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class LRUFileCache:
+    """Size-bounded LRU cache of file contents
+
+    Entries are validated against the file's mtime and size on every
+    lookup, so rebuilt files are never served stale.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, max_file_bytes=4 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def read(self, path, stat):
+        """Return the contents of path, from memory when possible"""
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            cached = self.entries.get(path)
+            if cached and cached[0] == key:
+                self.entries.move_to_end(path)
+                return cached[1]
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) > self.max_file_bytes:
+            return data
+
+        with self.lock:
+            previous = self.entries.pop(path, None)
+            if previous:
+                self.size -= len(previous[1])
+            self.entries[path] = (key, data)
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+        return data
+
+
+class LiveReload:
+    """Broadcasts reload events to browsers waiting on LIVERELOAD_PATH"""
+
+    def __init__(self):
+        self.version = 0
+        self.closed = False
+        self.condition = threading.Condition()
+
+    def notify(self):
+        with self.condition:
+            self.version += 1
+            self.condition.notify_all()
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def wait(self, version, timeout):
+        """Block until the version changes; return None once closed"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.closed or self.version != version, timeout)
+            return None if self.closed else self.version
+
+
+class ThreadPoolHTTPServer(HTTPServer):
+    """HTTP server that hands connections to a fixed pool of threads"""
+
+    allow_reuse_address = True
+
+    def __init__(self, address, handler, root, workers=32, cache=None, livereload=None):
+        super().__init__(address, handler)
+        self.root = os.path.realpath(root)
+        self.cache = cache or LRUFileCache()
+        self.livereload = livereload
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.connections = set()
+        self.connections_lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        with self.connections_lock:
+            self.connections.add(request)
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            with self.connections_lock:
+                self.connections.discard(request)
+            self.shutdown_request(request)
+
+    def handle_error(self, request, client_address):
+        # Browsers abort connections routinely (navigation, reloads)
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+    def server_close(self):
+        super().server_close()
+        if self.livereload:
+            self.livereload.close()
+        # Wake threads blocked on idle keep-alive connections
+        with self.connections_lock:
+            for request in self.connections:
+                try:
+                    request.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+        self.executor.shutdown(wait=True)
+
+
+class PreviewRequestHandler(BaseHTTPRequestHandler):
+    """Serve files from the server root with production-like caching"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'PreviewServer'
+    # Idle keep-alive connections are closed after this many seconds
+    timeout = 15
+
+    def do_GET(self):
+        self.serve(head=False)
+
+    def do_HEAD(self):
+        self.serve(head=True)
+
+    def translate_path(self, url_path):
+        """Map a URL path to a file or directory below the root, or None"""
+        url_path = url_path.split('?', 1)[0].split('#', 1)[0]
+        relative = os.path.normpath(unquote(url_path)).lstrip('/\\')
+        if any(part.startswith('.') and part not in PUBLIC_DOT_DIRS
+               for part in relative.split(os.sep)):
+            return None
+        path = os.path.realpath(os.path.join(self.server.root, relative))
+        if path != self.server.root and not path.startswith(self.server.root + os.sep):
+            return None
+        return path if os.path.exists(path) else None
+
+    def serve(self, head):
+        if self.path.split('?', 1)[0] == LIVERELOAD_PATH and self.server.livereload:
+            self.serve_livereload()
+            return
+
+        path = self.translate_path(self.path)
+        if path is not None and os.path.isdir(path):
+            url = urlsplit(self.path)
+            if not url.path.endswith('/'):
+                # Relative URLs on the index page resolve against the directory
+                self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+                self.send_header('Location', urlunsplit(url._replace(path=url.path + '/')))
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            path = os.path.join(path, 'index.html')
+        if path is None or not os.path.isfile(path):
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return
+
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        inject = self.server.livereload is not None and content_type == 'text/html'
+        ranged = 'Range' in self.headers and not inject
+
+        # Pick a precompressed sidecar unless a byte range was requested
+        encoding = None
+        if not inject and not ranged:
+            accepted = parse_accept_encoding(self.headers.get('Accept-Encoding', ''))
+            for name, suffix in ENCODINGS:
+                if accepted.get(name, 0) > 0 and os.path.isfile(path + suffix):
+                    encoding, path = name, path + suffix
+                    break
+
+        stat = os.stat(path)
+        variant = encoding or ('livereload' if inject else '')
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}' + (f'-{variant}"' if variant else '"')
+        last_modified = formatdate(stat.st_mtime, usegmt=True)
+
+        if self.not_modified(etag, stat.st_mtime):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_common_headers(path, etag, last_modified)
+            self.end_headers()
+            return
+
+        data = self.server.cache.read(path, stat)
+        if inject:
+            data = inject_livereload(data)
+
+        status = HTTPStatus.OK
+        content_range = None
+        if ranged:
+            try:
+                byte_range = parse_range(self.headers['Range'], len(data))
+            except ValueError:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header('Content-Range', f'bytes */{len(data)}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            if_range = self.headers.get('If-Range')
+            if byte_range and (if_range is None or if_range == etag):
+                start, end = byte_range
+                content_range = f'bytes {start}-{end}/{len(data)}'
+                data = data[start:end + 1]
+                status = HTTPStatus.PARTIAL_CONTENT
+
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        if content_range:
+            self.send_header('Content-Range', content_range)
+        self.send_common_headers(path, etag, last_modified)
+        self.end_headers()
+        if not head:
+            self.wfile.write(data)
+
+    def send_common_headers(self, path, etag, last_modified):
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', last_modified)
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Vary', 'Accept-Encoding')
+        name = path[:-3] if path.endswith(('.gz', '.br')) else path
+        if _FINGERPRINTED.search(name):
+            self.send_header('Cache-Control', 'public, max-age=31536000, immutable')
+        else:
+            self.send_header('Cache-Control', 'no-cache')
+
+    def not_modified(self, etag, mtime):
+        """Evaluate If-None-Match, falling back to If-Modified-Since"""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            return '*' in tags or etag in tags or f'W/{etag}' in tags
+
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(mtime) <= since
+        return False
+
+    def serve_livereload(self):
+        """Hold a server-sent events stream open and push reload events"""
+        livereload = self.server.livereload
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        version = livereload.version
+        try:
+            while True:
+                current = livereload.wait(version, timeout=self.timeout)
+                if current is None:
+                    return
+                if current == version:
+                    # Comment line keeps the connection alive
+                    self.wfile.write(b': ping\n\n')
+                else:
+                    version = current
+                    self.wfile.write(b'data: reload\n\n')
+                self.wfile.flush()
+        except OSError:
+            pass
+
+
+def parse_accept_encoding(header):
+    """Parse an Accept-Encoding header into {coding: q-value}"""
+    accepted = {}
+    for item in header.split(','):
+        parts = item.strip().split(';')
+        coding = parts[0].strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in parts[1:]:
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    if '*' in accepted:
+        for name, _ in ENCODINGS:
+            accepted.setdefault(name, accepted['*'])
+    return accepted
+
+
+def parse_range(header, size):
+    """Parse a single byte range
+
+    Returns (start, end) inclusive, or None to ignore the header
+    (multiple or malformed ranges are served in full). Raises ValueError
+    when the range cannot be satisfied.
+    """
+    match = _RANGE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if start == '':
+        # Suffix range: the last N bytes
+        length = int(end)
+        if length == 0 or size == 0:
+            raise ValueError(header)
+        return max(0, size - length), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def inject_livereload(data):
+    """Insert the live reload client before </body>"""
+    index = data.lower().rfind(b'</body>')
+    if index == -1:
+        return data + LIVERELOAD_SCRIPT
+    return data[:index] + LIVERELOAD_SCRIPT + data[index:]
+
+
+def watch_sources(builder_factory, livereload, interval=1.0, stop=None):
+    """Rebuild changed files and reload browsers until stop is set
+
+    builder_factory returns a fresh WebsiteBuilder; its incremental
+    manifest ensures only changed files are rebuilt.
+    """
+    stop = stop or threading.Event()
+    snapshot = builder_factory().discover_sources()
+    while not stop.wait(interval):
+        current = builder_factory().discover_sources()
+        if current == snapshot:
+            continue
+        snapshot = current
+        print("\n🔄 Change detected, rebuilding...")
+        started = time.perf_counter()
+        if builder_factory().build():
+            print(f"🔄 Rebuilt in {time.perf_counter() - started:.2f}s, reloading browsers")
+            livereload.notify()
@@ -0,0 +1,11 @@
+"""Make the build scripts importable the way they import each other"""
+
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / 'scripts'
+
+# Sample sites at the repository root
+SAMPLES_DIR = Path(__file__).resolve().parents[2]
+
+sys.path.insert(0, str(SCRIPTS_DIR))
@@ -0,0 +1,178 @@
+"""Tests for incremental builds: the manifest, parallel workers and rewrite rounds"""
+
+import os
+import json
+
+import build as build_module
+from build import ASSET_MANIFEST_NAME, MANIFEST_NAME, WebsiteBuilder
+
+SITE = {
+    'index.html': ('<html><head><link rel="stylesheet" href="css/main.css"></head>'
+                   '<body><h1 class="title">Home</h1><script src="js/app.js"></script></body></html>'),
+    'about/index.html': ('<html><head><link rel="stylesheet" href="../css/main.css"></head>'
+                         '<body><p>About</p></body></html>'),
+    'css/main.css': '@import "base.css";\n.title { background: url("../img/dot.svg"); }\n',
+    'css/base.css': 'body { color: red; }\n',
+    'img/dot.svg': '<svg xmlns="http://www.w3.org/2000/svg"></svg>',
+    'js/app.js': 'document.title = "Home"; // comment\n',
+}
+
+
+def write_files(root, files):
+    for path, content in files.items():
+        dest = root / path
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        dest.write_text(content, encoding='utf-8')
+
+
+def build(project, **options):
+    options.setdefault('jobs', 1)
+    options.setdefault('package', False)
+    builder = WebsiteBuilder(project, images=False, **options)
+    assert builder.build()
+    return builder
+
+
+def read_dist(project):
+    """Return {relative path: bytes} of every output in dist/"""
+    dist = project / 'dist'
+    return {path.relative_to(dist).as_posix(): path.read_bytes()
+            for path in dist.rglob('*') if path.is_file() and path.name != MANIFEST_NAME}
+
+
+def manifest(project):
+    with open(project / 'dist' / MANIFEST_NAME, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def asset_map(project):
+    with open(project / 'dist' / ASSET_MANIFEST_NAME, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_unchanged_sources_are_skipped(tmp_path):
+    write_files(tmp_path, SITE)
+    build(tmp_path)
+    before = read_dist(tmp_path)
+
+    builder = build(tmp_path)
+
+    assert builder.changed_files == set()
+    assert builder.results == []
+    assert read_dist(tmp_path).keys() == before.keys()
+
+
+def test_touched_source_is_compared_by_content(tmp_path):
+    write_files(tmp_path, SITE)
+    build(tmp_path)
+    path = tmp_path / 'js' / 'app.js'
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    builder = build(tmp_path)
+
+    # The worker read the file, found the same hash and kept the output
+    assert [result['key'] for result in builder.results] == ['js/app.js']
+    assert not builder.results[0]['changed']
+    assert builder.changed_files == set()
+    assert manifest(tmp_path)['files']['js/app.js']['mtime'] == path.stat().st_mtime
+
+
+def test_deleted_source_removes_its_outputs(tmp_path):
+    write_files(tmp_path, SITE)
+    build(tmp_path)
+    hashed = asset_map(tmp_path)['js/app.js']
+    (tmp_path / 'js' / 'app.js').unlink()
+    (tmp_path / 'about' / 'index.html').unlink()
+
+    builder = build(tmp_path)
+
+    files = read_dist(tmp_path)
+    assert builder.removed_files == ['about/index.html', 'js/app.js']
+    assert not any(path.startswith((hashed, 'js/app.js', 'about/')) for path in files)
+    assert not (tmp_path / 'dist' / 'about').exists()
+    assert 'js/app.js' not in manifest(tmp_path)['files']
+
+
+def test_changed_settings_rebuild_outputs(tmp_path, monkeypatch):
+    write_files(tmp_path, SITE)
+    build(tmp_path, critical=False)
+    hashed_css = asset_map(tmp_path)['css/main.css']
+
+    builder = build(tmp_path, critical=False, fingerprint=False)
+
+    files = read_dist(tmp_path)
+    assert 'css/main.css' in builder.changed_files
+    assert hashed_css not in files and ASSET_MANIFEST_NAME not in files
+    assert b'href="css/main.css"' in files['index.html']
+
+    # A new transform version invalidates every file of that type
+    monkeypatch.setitem(build_module.TRANSFORM_SETTINGS, '.js', {'minify': 'test'})
+    builder = build(tmp_path, critical=False, fingerprint=False)
+    assert builder.changed_files == {'js/app.js'}
+
+
+def test_clean_build_starts_from_scratch(tmp_path):
+    write_files(tmp_path, SITE)
+    build(tmp_path)
+    (tmp_path / 'dist' / 'stray.txt').write_text('left over', encoding='utf-8')
+
+    builder = build(tmp_path, clean=True)
+
+    assert 'stray.txt' not in read_dist(tmp_path)
+    assert {result['key'] for result in builder.results if result['changed']} == set(SITE)
+
+
+def test_package_is_reused_when_nothing_changed(tmp_path):
+    write_files(tmp_path, SITE)
+    build(tmp_path, package=True)
+    package = manifest(tmp_path)['package']
+
+    second = WebsiteBuilder(tmp_path, jobs=1, images=False)
+    second.timestamp = 'later'
+    assert second.build()
+
+    assert manifest(tmp_path)['package'] == package
+    assert sorted(path.name for path in tmp_path.glob('*.zip')) == [package]
+
+    write_files(tmp_path, {'js/app.js': 'document.title = "Changed";\n'})
+    third = WebsiteBuilder(tmp_path, jobs=1, images=False)
+    third.timestamp = 'latest'
+    assert third.build()
+    assert manifest(tmp_path)['package'] == 'website_latest.zip'
+
+
+def test_parallel_build_matches_serial_build(tmp_path):
+    serial, parallel = tmp_path / 'serial', tmp_path / 'parallel'
+    for project in (serial, parallel):
+        write_files(project, SITE)
+
+    build(serial, jobs=1)
+    build(parallel, jobs=3)
+
+    assert read_dist(parallel) == read_dist(serial)
+    assert manifest(parallel)['files'].keys() == manifest(serial)['files'].keys()
+
+
+def test_renamed_assets_propagate_to_unchanged_documents(tmp_path):
+    write_files(tmp_path, SITE)
+    build(tmp_path, critical=False)
+    old = asset_map(tmp_path)
+
+    # Only base.css changes; main.css imports it and the pages link main.css
+    write_files(tmp_path, {'css/base.css': 'body { color: blue; }\n'})
+    builder = build(tmp_path, critical=False, jobs=2)
+
+    new = asset_map(tmp_path)
+    files = read_dist(tmp_path)
+    assert new['css/base.css'] != old['css/base.css']
+    assert new['css/main.css'] != old['css/main.css']
+    assert {'css/base.css', 'css/main.css', 'index.html', 'about/index.html'} <= builder.changed_files
+    assert 'js/app.js' not in builder.changed_files
+
+    main = files[new['css/main.css']].decode('utf-8')
+    assert new['css/base.css'].rsplit('/', 1)[1] in main
+    for page in ('index.html', 'about/index.html'):
+        assert new['css/main.css'].rsplit('/', 1)[1].encode('utf-8') in files[page]
+    assert old['css/base.css'] not in files and old['css/main.css'] not in files
+    assert manifest(tmp_path)['files']['index.html']['assets']['css/main.css'] == new['css/main.css']
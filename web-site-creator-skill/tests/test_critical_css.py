@@ -0,0 +1,36 @@
+"""Tests for CSS pruning and critical CSS inlining"""
+
+import pytest
+
+from build import WebsiteBuilder
+
+PAGE = ('<html><head><link rel="stylesheet" href="css/main.css"></head>'
+        '<body><h1 class="title">Home</h1></body></html>')
+
+
+def build(project, **options):
+    assert WebsiteBuilder(project, jobs=1, package=False, images=False, **options).build()
+    return (project / 'dist' / 'index.html').read_text(encoding='utf-8')
+
+
+@pytest.mark.parametrize('fingerprint', [True, False])
+def test_stylesheet_edit_reaches_pruned_and_inlined_css(tmp_path, fingerprint):
+    (tmp_path / 'css').mkdir()
+    (tmp_path / 'index.html').write_text(PAGE, encoding='utf-8')
+    css = tmp_path / 'css' / 'main.css'
+    css.write_text('body { color: red; } .title { margin: 0; } .unused { color: green; }',
+                   encoding='utf-8')
+
+    page = build(tmp_path, fingerprint=fingerprint)
+    assert 'color:red' in page
+
+    css.write_text('body { color: blue; } .title { margin: 0; } .unused { color: green; }',
+                   encoding='utf-8')
+    page = build(tmp_path, fingerprint=fingerprint)
+
+    pruned = [path.read_text(encoding='utf-8') for path in (tmp_path / 'dist' / 'css').iterdir()
+              if '.pruned' in path.name and path.suffix == '.css']
+    assert len(pruned) == 1
+    assert 'color:blue' in pruned[0] and 'color:red' not in pruned[0]
+    assert '.unused' not in pruned[0]
+    assert 'color:blue' in page and 'color:red' not in page
@@ -0,0 +1,256 @@
+"""Tests for delta deployment to directories, FTP servers and GitHub Pages"""
+
+import json
+import shutil
+import threading
+import subprocess
+
+import pytest
+
+from delta_deploy import REMOTE_MANIFEST_NAME, DirectoryTarget, FTPTarget, deploy
+from deploy import WebsiteDeployer
+
+SITE = {
+    'index.html': '<html><head><link rel="stylesheet" href="assets/main.css"></head></html>',
+    'about/index.html': '<html><body>About</body></html>',
+    'assets/main.css': 'body{color:red}',
+    'assets/logo.svg': '<svg></svg>',
+    'robots.txt': 'User-agent: *',
+}
+
+
+def write_files(root, files):
+    for path, content in files.items():
+        dest = root / path
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        dest.write_text(content, encoding='utf-8')
+
+
+def read_tree(root, skip=('.git',)):
+    """Return {relative path: content} of all files below root"""
+    return {path.relative_to(root).as_posix(): path.read_text(encoding='utf-8')
+            for path in root.rglob('*')
+            if path.is_file() and not set(path.relative_to(root).parts) & set(skip)}
+
+
+@pytest.fixture
+def dist(tmp_path):
+    root = tmp_path / 'dist'
+    write_files(root, SITE)
+    return root
+
+
+class RecordingTarget(DirectoryTarget):
+    """DirectoryTarget that records the order of its operations"""
+
+    def __init__(self, path, **kwargs):
+        super().__init__(path, **kwargs)
+        self.operations = []
+        self.lock = threading.Lock()
+
+    def upload(self, connection, local_path, remote_path):
+        super().upload(connection, local_path, remote_path)
+        with self.lock:
+            self.operations.append(('upload', remote_path))
+
+    def delete(self, connection, remote_path):
+        super().delete(connection, remote_path)
+        with self.lock:
+            self.operations.append(('delete', remote_path))
+
+    def write_manifest(self, connection, data):
+        super().write_manifest(connection, data)
+        self.operations.append(('manifest', None))
+
+
+def test_directory_target_mirrors_build(dist, tmp_path):
+    remote = tmp_path / 'remote'
+    stats = deploy(dist, DirectoryTarget(remote))
+
+    assert stats == {'uploaded': len(SITE), 'deleted': 0, 'unchanged': 0}
+    assert read_tree(remote, skip=(REMOTE_MANIFEST_NAME,)) == SITE
+    manifest = json.loads((remote / REMOTE_MANIFEST_NAME).read_text(encoding='utf-8'))
+    assert sorted(manifest['files']) == sorted(SITE)
+
+
+def test_second_run_transfers_nothing(dist, tmp_path):
+    target = RecordingTarget(tmp_path / 'remote')
+    deploy(dist, target)
+    target.operations.clear()
+
+    stats = deploy(dist, target)
+
+    assert stats == {'uploaded': 0, 'deleted': 0, 'unchanged': len(SITE)}
+    assert target.operations == [('manifest', None)]
+
+
+def test_upload_order(dist, tmp_path):
+    target = RecordingTarget(tmp_path / 'remote')
+    deploy(dist, target)
+    target.operations.clear()
+
+    write_files(dist, {'assets/main.css': 'body{color:blue}', 'assets/new.js': 'go()',
+                       'index.html': '<html>changed</html>', 'contact.html': '<html></html>'})
+    (dist / 'assets' / 'logo.svg').unlink()
+    (dist / 'about' / 'index.html').unlink()
+    stats = deploy(dist, target, workers=4)
+
+    kinds = [kind for kind, _ in target.operations]
+    paths = [path for _, path in target.operations]
+    assert stats == {'uploaded': 4, 'deleted': 2, 'unchanged': 1}
+    assert kinds == ['upload'] * 4 + ['delete'] * 2 + ['manifest']
+    assert set(paths[:2]) == {'assets/main.css', 'assets/new.js'}
+    assert set(paths[2:4]) == {'index.html', 'contact.html'}
+    assert set(paths[4:6]) == {'assets/logo.svg', 'about/index.html'}
+    # Directories emptied by deletions are removed
+    assert not (tmp_path / 'remote' / 'about').exists()
+
+
+def test_manifest_outside_root(dist, tmp_path):
+    remote = tmp_path / 'remote'
+    write_files(remote, {REMOTE_MANIFEST_NAME: '{}'})
+    manifest = tmp_path / 'private' / 'manifest.json'
+
+    deploy(dist, DirectoryTarget(remote, manifest_path=manifest))
+
+    assert read_tree(remote) == SITE
+    assert sorted(json.loads(manifest.read_text(encoding='utf-8'))['files']) == sorted(SITE)
+    assert deploy(dist, DirectoryTarget(remote, manifest_path=manifest))['uploaded'] == 0
+
+
+class FlakyTarget(DirectoryTarget):
+    """DirectoryTarget whose first connection drops on every upload"""
+
+    def __init__(self, path, **kwargs):
+        super().__init__(path, **kwargs)
+        self.opened = 0
+        self.closed = []
+
+    def connect(self):
+        super().connect()
+        self.opened += 1
+        return self.opened
+
+    def disconnect(self, connection):
+        self.closed.append(connection)
+
+    def upload(self, connection, local_path, remote_path):
+        if connection == 1:
+            raise EOFError('connection dropped')
+        super().upload(connection, local_path, remote_path)
+
+
+def test_failed_connection_is_replaced(dist, tmp_path):
+    target = FlakyTarget(tmp_path / 'remote')
+
+    stats = deploy(dist, target, workers=1)
+
+    assert stats['uploaded'] == len(SITE)
+    assert read_tree(tmp_path / 'remote', skip=(REMOTE_MANIFEST_NAME,)) == SITE
+    # The broken connection is closed at once and never reused
+    assert target.opened == 2
+    assert target.closed == [1, 2]
+
+
+def test_dry_run_changes_nothing(dist, tmp_path):
+    remote = tmp_path / 'remote'
+    stats = deploy(dist, DirectoryTarget(remote), dry_run=True)
+
+    assert stats['uploaded'] == len(SITE)
+    assert read_tree(remote) == {}
+
+
+@pytest.fixture
+def ftp_server(tmp_path):
+    """A local stand-in FTP server serving tmp_path/ftp"""
+    pytest.importorskip('pyftpdlib')
+    from pyftpdlib.authorizers import DummyAuthorizer
+    from pyftpdlib.handlers import FTPHandler
+    from pyftpdlib.servers import ThreadedFTPServer
+
+    root = tmp_path / 'ftp'
+    root.mkdir()
+    received = []
+    authorizer = DummyAuthorizer()
+    authorizer.add_user('user', 'secret', str(root), perm='elradfmwMT')
+    handler = type('Handler', (FTPHandler,), {
+        'authorizer': authorizer,
+        'on_file_received': lambda self, path: received.append(path),
+    })
+    server = ThreadedFTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, kwargs={'timeout': 0.1})
+    thread.start()
+    try:
+        yield root, server.address[1], received
+    finally:
+        server.close_all()
+        thread.join()
+
+
+def test_ftp_target(dist, ftp_server):
+    root, port, received = ftp_server
+
+    def target():
+        return FTPTarget('127.0.0.1', 'user', 'secret', '/www', port=port,
+                         manifest_path='/private/manifest.json')
+
+    stats = deploy(dist, target(), workers=3)
+
+    assert stats['uploaded'] == len(SITE)
+    assert read_tree(root / 'www') == SITE
+    assert (root / 'private' / 'manifest.json').exists()
+    # Files are stored under a temporary name and renamed into place
+    assert len(received) == len(SITE) + 1
+    assert all(path.endswith('.tmp') for path in received)
+
+    (dist / 'robots.txt').unlink()
+    stats = deploy(dist, target(), workers=3)
+    assert stats == {'uploaded': 0, 'deleted': 1, 'unchanged': len(SITE) - 1}
+    assert not (root / 'www' / 'robots.txt').exists()
+
+
+def git(*args, cwd):
+    return subprocess.run(['git', *args], cwd=cwd, check=True, capture_output=True,
+                          text=True).stdout.strip()
+
+
+@pytest.fixture
+def git_project(tmp_path, monkeypatch):
+    """A project with sources and a local bare repository as origin"""
+    if shutil.which('git') is None:
+        pytest.skip('git not installed')
+    for variable in ('GIT_AUTHOR_NAME', 'GIT_COMMITTER_NAME'):
+        monkeypatch.setenv(variable, 'Test')
+    for variable in ('GIT_AUTHOR_EMAIL', 'GIT_COMMITTER_EMAIL'):
+        monkeypatch.setenv(variable, 'test@example.com')
+
+    bare = tmp_path / 'origin.git'
+    git('init', '-q', '--bare', str(bare), cwd=tmp_path)
+    project = tmp_path / 'project'
+    write_files(project, {'index.html': '<html><body>Home</body></html>',
+                          'assets/css/main.css': 'body { color: red; }'})
+    git('init', '-q', cwd=project)
+    git('remote', 'add', 'origin', str(bare), cwd=project)
+    return project, bare
+
+
+def test_github_pages_deploys_to_bare_remote(git_project, tmp_path):
+    project, bare = git_project
+    deployer = WebsiteDeployer(project)
+
+    assert deployer.deploy_to_github_pages(workers=2)
+    assert deployer.deploy_to_github_pages(workers=2)
+    # Nothing changed, so the second deployment adds no commit
+    assert git('rev-list', '--count', 'gh-pages', cwd=bare) == '1'
+
+    write_files(project, {'assets/css/main.css': 'body { color: blue; }'})
+    assert deployer.deploy_to_github_pages(workers=2)
+    assert git('rev-list', '--count', 'gh-pages', cwd=bare) == '2'
+
+    clone = tmp_path / 'clone'
+    git('clone', '-q', '--branch', 'gh-pages', str(bare), str(clone), cwd=tmp_path)
+    published = read_tree(clone)
+    assert 'index.html' in published
+    assert REMOTE_MANIFEST_NAME not in published
+    assert any('blue' in content for path, content in published.items() if path.endswith('.css'))
+    assert not any('red' in content for path, content in published.items() if path.endswith('.css'))
@@ -0,0 +1,109 @@
+"""Tests for asset fingerprinting and reference rewriting"""
+
+import os
+import json
+
+from build import ASSET_MANIFEST_NAME, WebsiteBuilder
+from fingerprint import rewrite_html
+
+ASSETS = {'img/og.jpg': 'img/og.1234abcd.jpg'}
+
+
+def build(project, **options):
+    assert WebsiteBuilder(project, jobs=1, package=False, images=False, **options).build()
+    return (project / 'dist' / 'index.html').read_text(encoding='utf-8')
+
+
+def test_social_image_meta_tags_are_rewritten():
+    page = ('<meta property="og:image" content="img/og.jpg">'
+            '<meta content="img/og.jpg" name="twitter:image" />'
+            '<meta property="og:title" content="img/og.jpg">')
+    references = set()
+
+    rewritten = rewrite_html(page, 'index.html', ASSETS, references)
+
+    assert rewritten == ('<meta property="og:image" content="img/og.1234abcd.jpg">'
+                         '<meta content="img/og.1234abcd.jpg" name="twitter:image" />'
+                         '<meta property="og:title" content="img/og.jpg">')
+    assert references == {'img/og.jpg'}
+
+
+def test_unrewritten_references_still_resolve(tmp_path):
+    (tmp_path / 'img').mkdir()
+    (tmp_path / 'img' / 'hero.jpg').write_bytes(b'hero')
+    (tmp_path / 'app.js').write_text("import './util.js'; img.src = 'img/hero.jpg';",
+                                     encoding='utf-8')
+    (tmp_path / 'util.js').write_text('export const x = 1;', encoding='utf-8')
+    (tmp_path / 'index.html').write_text(
+        '<html><head><meta property="og:image" content="img/hero.jpg">'
+        '<script type="module" src="app.js"></script></head><body></body></html>',
+        encoding='utf-8')
+
+    page = build(tmp_path)
+
+    dist = tmp_path / 'dist'
+    asset_map = json.loads((dist / ASSET_MANIFEST_NAME).read_text(encoding='utf-8'))
+    assert f'content="{asset_map["img/hero.jpg"]}"' in page
+    assert f'src="{asset_map["app.js"]}"' in page
+    # References inside scripts are left alone, so the original names must exist
+    for key in ('img/hero.jpg', 'app.js', 'util.js'):
+        assert (dist / asset_map[key]).exists()
+        assert (dist / key).read_bytes() == (dist / asset_map[key]).read_bytes()
+
+    # A changed asset refreshes the copy and drops the old hashed name
+    old = asset_map['img/hero.jpg']
+    (tmp_path / 'img' / 'hero.jpg').write_bytes(b'new hero')
+    build(tmp_path)
+    assert (dist / 'img' / 'hero.jpg').read_bytes() == b'new hero'
+    assert not (dist / old).exists()
+
+
+def test_fonts_are_built_and_referenced(tmp_path):
+    (tmp_path / 'fonts').mkdir()
+    (tmp_path / 'css').mkdir()
+    (tmp_path / 'fonts' / 'a.woff2').write_bytes(b'wOF2 font')
+    (tmp_path / 'css' / 'main.css').write_text(
+        '@font-face { font-family: A; src: url("../fonts/a.woff2") format("woff2"); }',
+        encoding='utf-8')
+    (tmp_path / 'index.html').write_text(
+        '<html><head><link rel="stylesheet" href="css/main.css"></head><body></body></html>',
+        encoding='utf-8')
+
+    build(tmp_path, critical=False)
+
+    dist = tmp_path / 'dist'
+    asset_map = json.loads((dist / ASSET_MANIFEST_NAME).read_text(encoding='utf-8'))
+    font = asset_map['fonts/a.woff2']
+    assert (dist / font).read_bytes() == b'wOF2 font'
+    css = (dist / asset_map['css/main.css']).read_text(encoding='utf-8')
+    assert f'url("../fonts/{font.rsplit("/", 1)[1]}")' in css
+
+
+def touch(path):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def test_touched_import_does_not_rebuild_importers(tmp_path):
+    (tmp_path / 'css').mkdir()
+    (tmp_path / 'css' / 'main.css').write_text('@import "base.css";\na { color: red; }',
+                                               encoding='utf-8')
+    (tmp_path / 'css' / 'base.css').write_text('body { margin: 0; }', encoding='utf-8')
+    (tmp_path / 'index.html').write_text(
+        '<html><head><link rel="stylesheet" href="css/main.css"></head></html>', encoding='utf-8')
+    build(tmp_path, critical=False)
+
+    touch(tmp_path / 'css' / 'base.css')
+    builder = WebsiteBuilder(tmp_path, jobs=1, package=False, images=False, critical=False)
+    assert builder.build()
+    assert [result['key'] for result in builder.results] == ['css/base.css']
+    assert builder.changed_files == set()
+
+    # A touched importer kept from the last build still follows a rename
+    touch(tmp_path / 'css' / 'main.css')
+    (tmp_path / 'css' / 'base.css').write_text('body { margin: 1px; }', encoding='utf-8')
+    page = build(tmp_path, critical=False)
+    asset_map = json.loads((tmp_path / 'dist' / ASSET_MANIFEST_NAME).read_text(encoding='utf-8'))
+    main = (tmp_path / 'dist' / asset_map['css/main.css']).read_text(encoding='utf-8')
+    assert asset_map['css/base.css'].split('/')[-1] in main
+    assert asset_map['css/main.css'].split('/')[-1] in page
@@ -0,0 +1,68 @@
+"""Tests for image optimization and responsive markup"""
+
+import pytest
+
+from build import WebsiteBuilder
+from images import variant_key
+
+
+def build(project, **options):
+    assert WebsiteBuilder(project, jobs=1, package=False, **options).build()
+    return (project / 'dist' / 'index.html').read_text(encoding='utf-8')
+
+
+def test_variant_key_keeps_source_extension():
+    assert variant_key('a/logo.jpg', '-640w.webp') == 'a/logo.jpg-640w.webp'
+    assert variant_key('a/logo.jpg', '-640w.webp') != variant_key('a/logo.png', '-640w.webp')
+
+
+@pytest.mark.parametrize('fingerprint', [True, False])
+def test_images_with_the_same_stem_keep_their_own_variants(tmp_path, fingerprint):
+    Image = pytest.importorskip('PIL.Image')
+    (tmp_path / 'img').mkdir()
+    Image.new('RGB', (800, 600), (0, 200, 0)).save(tmp_path / 'img' / 'logo.jpg')
+    Image.new('RGB', (800, 600), (200, 0, 0)).save(tmp_path / 'img' / 'logo.png')
+    (tmp_path / 'index.html').write_text(
+        '<html><body><img src="img/logo.png" alt="Logo"></body></html>', encoding='utf-8')
+
+    page = build(tmp_path, fingerprint=fingerprint)
+    assert 'logo.png-320w' in page and 'logo.jpg-' not in page
+
+    (tmp_path / 'img' / 'logo.jpg').unlink()
+    page = build(tmp_path, fingerprint=fingerprint)
+    outputs = {path.name for path in (tmp_path / 'dist' / 'img').iterdir()}
+    webp = [name for name in outputs if name.startswith('logo.png-320w') and name.endswith('.webp')]
+    assert webp and webp[0] in page
+    assert not any(name.startswith('logo.jpg') for name in outputs)
+
+
+def test_animated_images_are_copied_unchanged(tmp_path):
+    Image = pytest.importorskip('PIL.Image')
+    (tmp_path / 'img').mkdir()
+    frames = [Image.new('RGB', (800, 600), (40 * i, 0, 0)) for i in range(5)]
+    frames[0].save(tmp_path / 'img' / 'anim.webp', save_all=True, append_images=frames[1:])
+    (tmp_path / 'index.html').write_text(
+        '<html><body><img src="img/anim.webp" alt="Animation"></body></html>', encoding='utf-8')
+
+    page = build(tmp_path, fingerprint=False)
+
+    output = tmp_path / 'dist' / 'img' / 'anim.webp'
+    assert output.read_bytes() == (tmp_path / 'img' / 'anim.webp').read_bytes()
+    with Image.open(output) as image:
+        assert image.n_frames == 5
+    assert [path.name for path in output.parent.iterdir()] == ['anim.webp']
+    assert 'srcset' not in page and 'width="800" height="600"' in page
+
+
+def test_uppercase_extensions_are_built(tmp_path):
+    Image = pytest.importorskip('PIL.Image')
+    (tmp_path / 'img').mkdir()
+    Image.new('RGB', (800, 600), (0, 0, 200)).save(tmp_path / 'img' / 'IMG_001.JPG', 'JPEG')
+    (tmp_path / 'index.html').write_text(
+        '<html><body><img src="img/IMG_001.JPG" alt="Photo"></body></html>', encoding='utf-8')
+
+    page = build(tmp_path, fingerprint=False)
+
+    assert (tmp_path / 'dist' / 'img' / 'IMG_001.JPG').exists()
+    assert 'srcset="img/IMG_001.JPG-320w.jpg 320w' in page
+    assert (tmp_path / 'dist' / 'img' / 'IMG_001.JPG-320w.webp').exists()
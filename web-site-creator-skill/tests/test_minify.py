@@ -0,0 +1,106 @@
+"""Tests for the streaming CSS and JavaScript minifiers"""
+
+import shutil
+import subprocess
+
+import pytest
+
+from conftest import SAMPLES_DIR
+from minify import CSSMinifier, JSMinifier, minify_text
+
+SAMPLE_SITES = ('vacation-rental-marketplace', 'fashion-model-portfolio', 'portfolio-website')
+
+NODE = shutil.which('node')
+
+
+def minify_in_chunks(content, minifier_class):
+    """Minify content split at every position; all results must agree"""
+    results = {minify_text(content, minifier_class(), size) for size in range(1, len(content) + 1)}
+    assert len(results) == 1, results
+    return results.pop()
+
+
+@pytest.mark.parametrize('source, expected', [
+    ('a { background: url("x.png") ; }\n/* c */\nb { color: red ; }',
+     'a{background:url("x.png")}b{color:red}'),
+    ("a { background: url( 'data:image/svg+xml;utf8,<svg a=\"b\"></svg>' ) ; }\n/* c */ b { }",
+     "a{background:url('data:image/svg+xml;utf8,<svg a=\"b\"></svg>')}b{}"),
+    ('a { background: url( x.png ) ; }  /* c */  b { color: red }',
+     'a{background:url( x.png )}b{color:red}'),
+])
+def test_css_url(source, expected):
+    assert minify_in_chunks(source, CSSMinifier) == expected
+
+
+def test_css_quoted_url_keeps_buffer_bounded():
+    minifier = CSSMinifier()
+    minifier.feed('a { background: url("x.png") ; }\n')
+    for _ in range(100):
+        minifier.feed('b { color : red ; }\n/* comment */\n')
+    assert len(minifier.buffer) < 100
+
+
+def test_css_preserves_strings_and_license_comments():
+    source = '/*! License */\n.a::after { content: "  a ; b  " ; }\n'
+    assert minify_in_chunks(source, CSSMinifier) == '/*! License */ .a::after{content:"  a ; b  "}'
+
+
+def test_js_keeps_line_breaks_needed_by_asi():
+    source = 'let a = 1\nlet b = a\n++b\nreturn /x/.test(s) // c\n'
+    assert minify_in_chunks(source, JSMinifier) == 'let a=1\nlet b=a\n++b\nreturn/x/.test(s)'
+
+
+def run_node(code):
+    """Run a script with node and return what it printed"""
+    result = subprocess.run([NODE, '-e', code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+@pytest.mark.parametrize('source, expected', [
+    ('if (true) / +/.test(s) ? r=1 : r=2', 'if(true)/ +/.test(s)?r=1:r=2'),
+    ('while (i++ < 1) / a /.test(s) && (r += 1)', 'while(i++<1)/ a /.test(s)&&(r+=1)'),
+    ('for (;i < 1;i++) / a /g.test(s) ? r=1 : r=2', 'for(;i<1;i++)/ a /g.test(s)?r=1:r=2'),
+    ('r = (s.length) / 2 / 1', 'r=(s.length)/2/1'),
+])
+def test_js_regex_after_statement_head(source, expected):
+    minified = minify_in_chunks(source, JSMinifier)
+    assert minified == expected
+    if NODE:
+        program = "let s = ' a ', r = 0, i = 0; {}; console.log(r)"
+        assert run_node(program.format(minified)) == run_node(program.format(source))
+
+
+@pytest.mark.parametrize('site', SAMPLE_SITES)
+def test_sample_stylesheets_have_no_comments_left(site):
+    path = SAMPLES_DIR / site / 'assets' / 'css' / 'main.css'
+    if not path.exists():
+        pytest.skip(f"sample site {site} not present")
+    content = path.read_text(encoding='utf-8')
+    minified = minify_text(content, CSSMinifier(), 4096)
+    assert '/*' not in minified
+    assert '\n' not in minified
+
+
+@pytest.mark.parametrize('site', SAMPLE_SITES)
+def test_sample_scripts_parse_to_the_same_ast(site):
+    esprima = pytest.importorskip('esprima')
+    path = SAMPLES_DIR / site / 'assets' / 'js' / 'main.js'
+    if not path.exists():
+        pytest.skip(f"sample site {site} not present")
+    content = path.read_text(encoding='utf-8')
+    minified = minify_text(content, JSMinifier(), 4096)
+    assert esprima.parseScript(minified).toDict() == esprima.parseScript(content).toDict()
+
+
+@pytest.mark.skipif(NODE is None, reason='node not installed')
+@pytest.mark.parametrize('site', SAMPLE_SITES)
+def test_sample_scripts_stay_valid_in_node(site, tmp_path):
+    path = SAMPLES_DIR / site / 'assets' / 'js' / 'main.js'
+    if not path.exists():
+        pytest.skip(f"sample site {site} not present")
+    minified = tmp_path / 'main.min.js'
+    minified.write_text(minify_text(path.read_text(encoding='utf-8'), JSMinifier(), 4096),
+                        encoding='utf-8')
+    result = subprocess.run([NODE, '--check', str(minified)], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
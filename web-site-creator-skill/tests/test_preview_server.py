@@ -0,0 +1,54 @@
+"""Tests for the preview server"""
+
+import threading
+import http.client
+
+import pytest
+
+from preview_server import PreviewRequestHandler, ThreadPoolHTTPServer
+
+
+@pytest.fixture
+def server(tmp_path):
+    """A preview server on a free port serving tmp_path"""
+    for path, content in {'index.html': 'home', 'pages/property/index.html': 'property',
+                          '.build-manifest.json': '{}', '.git/config': '[core]',
+                          '.well-known/security.txt': 'Contact: x'}.items():
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text(content, encoding='utf-8')
+
+    httpd = ThreadPoolHTTPServer(('127.0.0.1', 0), PreviewRequestHandler, tmp_path, workers=2)
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={'poll_interval': 0.05})
+    thread.start()
+    try:
+        yield httpd.server_address[1]
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+        thread.join()
+
+
+def get(port, path):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+    try:
+        connection.request('GET', path)
+        response = connection.getresponse()
+        return response.status, response.getheader('Location'), response.read()
+    finally:
+        connection.close()
+
+
+def test_directory_without_slash_is_redirected(server):
+    assert get(server, '/pages/property') == (301, '/pages/property/', b'')
+    assert get(server, '/pages/property?a=1') == (301, '/pages/property/?a=1', b'')
+    assert get(server, '/pages/property/') == (200, None, b'property')
+    assert get(server, '/') == (200, None, b'home')
+
+
+@pytest.mark.parametrize('path', ['/.build-manifest.json', '/.git/config', '/pages/../.git/config'])
+def test_dot_paths_are_not_served(server, path):
+    assert get(server, path)[0] == 404
+
+
+def test_well_known_is_served(server):
+    assert get(server, '/.well-known/security.txt') == (200, None, b'Contact: x')